@@ -1,29 +1,164 @@
 """模型适配器使用示例
 
 演示如何使用AgentlyFormat的模型适配器功能。
+
+可选安装uvloop（pip install "AgentlyFormat[speedups]"）以获得更快的事件循环。
 """
 
 import asyncio
+import contextlib
+import importlib
+import inspect
 import json
 import os
-from typing import Dict, Any, List, Optional
+import sys
+from dataclasses import replace
+from typing import Dict, Any, List, Optional, Tuple
+
+from agently_format.adapters.model_adapter import BaseModelAdapter, use_uvloop
+from agently_format.core.streaming_parser import StreamingParser
+from agently_format.types.events import EventType
+from agently_format.types.models import ModelConfig, ModelType, ChatMessage
+
+
+# 各提供商的基础配置，示例中只按需替换密钥等少量字段
+_BASE_CONFIGS: Dict[str, ModelConfig] = {
+    "openai": ModelConfig(
+        model_type=ModelType.OPENAI,
+        model_name="gpt-3.5-turbo",
+        api_key="mock-openai-key",
+        base_url="https://api.openai.com/v1"
+    ),
+    "doubao": ModelConfig(
+        model_type=ModelType.DOUBAO,
+        model_name="doubao-pro-4k",
+        api_key="mock-doubao-key",
+        base_url="https://ark.cn-beijing.volces.com/api/v3"
+    ),
+    "custom": ModelConfig(
+        model_type=ModelType.CUSTOM,
+        model_name="my-custom-model",
+        api_key="custom-api-key",
+        base_url="https://api.example.com/v1"
+    ),
+    "baidu": ModelConfig(
+        model_type=ModelType.BAIDU,
+        model_name="ernie-4.0-8k",
+        api_key="mock-wenxin-key",
+        base_url="https://aip.baidubce.com"
+    ),
+    "qwen": ModelConfig(
+        model_type=ModelType.QWEN,
+        model_name="qwen-turbo",
+        api_key="mock-qianwen-key",
+        base_url="https://dashscope.aliyuncs.com/api/v1"
+    ),
+    "deepseek": ModelConfig(
+        model_type=ModelType.DEEPSEEK,
+        model_name="deepseek-chat",
+        api_key="mock-deepseek-key",
+        base_url="https://api.deepseek.com/v1"
+    ),
+    "kimi": ModelConfig(
+        model_type=ModelType.KIMI,
+        model_name="moonshot-v1-8k",
+        api_key="mock-kimi-key",
+        base_url="https://api.moonshot.cn/v1"
+    ),
+}
+
+# 模型类型到适配器所在模块的映射，按需导入
+_ADAPTER_MODULES: Dict[ModelType, Tuple[str, str]] = {
+    ModelType.OPENAI: ("agently_format.adapters.openai_adapter", "OpenAIAdapter"),
+    ModelType.DOUBAO: ("agently_format.adapters.doubao_adapter", "DoubaoAdapter"),
+    ModelType.BAIDU: ("agently_format.adapters.wenxin_adapter", "WenxinAdapter"),
+    ModelType.QWEN: ("agently_format.adapters.qianwen_adapter", "QianwenAdapter"),
+    ModelType.DEEPSEEK: ("agently_format.adapters.deepseek_adapter", "DeepSeekAdapter"),
+    ModelType.KIMI: ("agently_format.adapters.kimi_adapter", "KimiAdapter"),
+    ModelType.CUSTOM: ("agently_format.adapters.custom_adapter", "CustomAdapter"),
+}
+
+
+def _load_adapter_class(model_type: ModelType) -> type:
+    """按模型类型导入对应的适配器类"""
+    module_name, class_name = _ADAPTER_MODULES[model_type]
+    return getattr(importlib.import_module(module_name), class_name)
 
-from agently_format.adapters.base import BaseModelAdapter
-from agently_format.adapters.openai_adapter import OpenAIAdapter
-from agently_format.adapters.doubao_adapter import DoubaoAdapter
-from agently_format.adapters.custom_adapter import CustomAdapter
-from agently_format.adapters.wenxin_adapter import WenxinAdapter
-from agently_format.adapters.qianwen_adapter import QianwenAdapter
-from agently_format.adapters.deepseek_adapter import DeepSeekAdapter
-from agently_format.adapters.kimi_adapter import KimiAdapter
-from agently_format.adapters.factory import ModelAdapterFactory
-from agently_format.core.types import ModelConfig, ChatMessage
+
+# 示例中使用的固定提示词，在模块加载时构造一次，各示例共享
+SYSTEM_JSON_FORMATTER = ChatMessage.fast(
+    role="system",
+    content="你是一个专业的JSON数据格式化助手。请帮助用户生成和格式化JSON数据。"
+)
+SYSTEM_DATA_ANALYST = ChatMessage.fast(
+    role="system",
+    content="你是一个专业的数据分析师，擅长处理和分析JSON格式的数据。"
+)
+USER_PROFILE_REQ = ChatMessage.fast(
+    role="user",
+    content="请生成一个包含用户信息的JSON对象，包括姓名、年龄、邮箱和偏好设置。"
+)
+USER_APP_CONFIG_REQ = ChatMessage.fast(
+    role="user",
+    content="请逐步生成一个复杂的配置文件JSON，包含应用设置、用户偏好和系统配置。"
+)
+USER_SHOP_ITEM_REQ = ChatMessage.fast(
+    role="user",
+    content="请帮我生成一个电商网站的商品数据JSON结构，包含商品基本信息、价格、库存和评价数据。"
+)
+USER_PRODUCT_REQ = ChatMessage.fast(
+    role="user",
+    content="请生成一个电商产品信息的JSON数据，包含产品名称、价格、分类、库存等信息。"
+)
+USER_SETTINGS_REQ = ChatMessage.fast(
+    role="user",
+    content="请生成一个用户配置文件的JSON结构，包含个人信息、偏好设置和权限配置。"
+)
+USER_CODE_REQ = ChatMessage.fast(
+    role="user",
+    content="请生成一个Python函数，用于解析和验证JSON配置文件，包含错误处理和类型检查。"
+)
+USER_API_DOC_REQ = ChatMessage.fast(
+    role="user",
+    content="请生成一个完整的API文档JSON结构，包含端点定义、参数说明、响应格式和错误代码。"
+)
+USER_SIMPLE_JSON_REQ = ChatMessage.fast(
+    role="user",
+    content="请生成一个简单的JSON示例"
+)
+
+
+# 自定义响应转换器使用的字段名，批量调用时复用同一组常量
+_K_CONTENT = sys.intern("content")
+_K_MODEL = sys.intern("model")
+_K_USAGE = sys.intern("usage")
+_K_FINISH = sys.intern("finish_reason")
+_K_PROMPT_TOKENS = sys.intern("prompt_tokens")
+_K_COMPLETION_TOKENS = sys.intern("completion_tokens")
+_K_TOTAL_TOKENS = sys.intern("total_tokens")
+
+
+def _custom_response_transformer(raw_response: Dict[str, Any]) -> Dict[str, Any]:
+    """自定义响应转换器"""
+    get = raw_response.get
+    return {
+        _K_CONTENT: get("text", ""),
+        _K_MODEL: get("model_id", "custom-model"),
+        _K_USAGE: {
+            _K_PROMPT_TOKENS: get("input_tokens", 0),
+            _K_COMPLETION_TOKENS: get("output_tokens", 0),
+            _K_TOTAL_TOKENS: get("total_tokens", 0)
+        },
+        _K_FINISH: get("stop_reason", "stop")
+    }
 
 
 class ModelAdapterDemo:
     """模型适配器演示类"""
     
     def __init__(self):
+        from agently_format.adapters.factory import ModelAdapterFactory
+
         self.factory = ModelAdapterFactory()
         self.adapters: Dict[str, BaseModelAdapter] = {}
     
@@ -34,6 +169,53 @@ class ModelAdapterDemo:
         self.adapters.clear()
 
 
+async def _maybe_await(value: Any) -> Any:
+    """兼容同步和异步实现的调用结果"""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _run_provider_demo(
+    adapter: BaseModelAdapter,
+    messages: List[ChatMessage],
+    **kwargs
+) -> Tuple[bool, Dict[str, Any], Optional[Any]]:
+    """并发验证密钥、获取模型信息，并乐观地发起聊天请求
+
+    验证密钥与获取模型信息互不依赖，聊天请求先行发出，
+    验证失败时再取消，可节省一次往返时延。
+
+    Args:
+        adapter: 模型适配器
+        messages: 聊天消息
+        **kwargs: 传递给chat_completion的其他参数
+
+    Returns:
+        Tuple[bool, Dict[str, Any], Optional[Any]]: (密钥是否有效, 模型信息, 聊天响应)，
+        密钥无效时聊天响应为None
+    """
+    valid_task = asyncio.create_task(adapter.validate_api_key())
+    info_task = asyncio.create_task(_maybe_await(adapter.get_model_info()))
+    chat_task = asyncio.create_task(
+        _maybe_await(adapter.chat_completion(messages=messages, stream=False, **kwargs))
+    )
+
+    try:
+        is_valid, model_info = await asyncio.gather(valid_task, info_task)
+    except BaseException:
+        chat_task.cancel()
+        raise
+
+    if not is_valid:
+        chat_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await chat_task
+        return False, model_info, None
+
+    return True, model_info, await chat_task
+
+
 async def openai_adapter_example():
     """OpenAI适配器示例"""
     print("=== OpenAI适配器示例 ===")
@@ -41,14 +223,7 @@ async def openai_adapter_example():
     # 注意: 这里使用环境变量或模拟密钥
     api_key = os.getenv('OPENAI_API_KEY', 'sk-mock-key-for-demo')
     
-    config = ModelConfig(
-        model_type="openai",
-        model_name="gpt-3.5-turbo",
-        api_key=api_key,
-        base_url="https://api.openai.com/v1",
-        timeout=30,
-        max_retries=3
-    )
+    config = replace(_BASE_CONFIGS["openai"], api_key=api_key, timeout=30, max_retries=3)
     
     print(f"配置信息:")
     print(f"  模型类型: {config.model_type}")
@@ -57,48 +232,35 @@ async def openai_adapter_example():
     print(f"  超时时间: {config.timeout}秒")
     
     try:
+        from agently_format.adapters.openai_adapter import OpenAIAdapter
+
         # 创建适配器
         adapter = OpenAIAdapter(config)
-        
-        # 验证API密钥
-        print(f"\n验证API密钥...")
-        is_valid = await adapter.validate_api_key()
+
+        # 准备聊天消息
+        messages = [SYSTEM_JSON_FORMATTER, USER_PROFILE_REQ]
+
+        # 验证API密钥、获取模型信息并发送聊天请求
+        print(f"\n验证API密钥并发送聊天请求...")
+        is_valid, model_info, response = await _run_provider_demo(
+            adapter,
+            messages,
+            temperature=0.7,
+            max_tokens=500
+        )
         print(f"API密钥有效性: {'✅ 有效' if is_valid else '❌ 无效'}")
-        
+
         if not is_valid:
             print("提示: 请设置有效的OPENAI_API_KEY环境变量")
+            await adapter.close()
             return
-        
-        # 获取模型信息
-        model_info = await adapter.get_model_info()
+
         print(f"\n模型信息:")
         print(f"  支持的功能: {model_info.get('capabilities', [])}")
         print(f"  上下文长度: {model_info.get('context_length', 'Unknown')}")
         print(f"  输入价格: ${model_info.get('input_price', 0)}/1K tokens")
         print(f"  输出价格: ${model_info.get('output_price', 0)}/1K tokens")
-        
-        # 准备聊天消息
-        messages = [
-            ChatMessage(
-                role="system",
-                content="你是一个专业的JSON数据格式化助手。请帮助用户生成和格式化JSON数据。"
-            ),
-            ChatMessage(
-                role="user",
-                content="请生成一个包含用户信息的JSON对象，包括姓名、年龄、邮箱和偏好设置。"
-            )
-        ]
-        
-        print(f"\n发送聊天请求...")
-        
-        # 非流式聊天
-        response = await adapter.chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.7,
-            max_tokens=500
-        )
-        
+
         print(f"\n聊天响应:")
         print(f"  内容: {response.content}")
         print(f"  模型: {response.model}")
@@ -126,16 +288,38 @@ async def openai_adapter_example():
             
         except json.JSONDecodeError:
             print("\n响应内容不是有效的JSON格式")
-        
+
+        # 流式JSON解析示例：边接收边解析，无需等待完整响应
+        print(f"\n流式JSON解析示例:")
+
+        parser = StreamingParser()
+        session_id = parser.create_session("openai-stream-json")
+
+        def on_field_done(event):
+            print(f"  字段完成: {event.data.path} = {event.data.value}")
+
+        parser.add_event_callback(EventType.DONE, on_field_done)
+
+        stream = await _maybe_await(adapter.chat_completion(
+            messages=messages,
+            stream=True,
+            temperature=0.7,
+            max_tokens=500
+        ))
+        async for content in stream:
+            await parser.parse_chunk(session_id, content)
+        await parser.parse_chunk(session_id, "", is_final=True)
+
+        streamed_json = parser.get_current_data(session_id)
+        if streamed_json:
+            print(f"\n流式解析的JSON:")
+            print(json.dumps(streamed_json, indent=2, ensure_ascii=False))
+        parser.cleanup_session(session_id)
+
         # 流式聊天示例
         print(f"\n流式聊天示例:")
         
-        stream_messages = [
-            ChatMessage(
-                role="user",
-                content="请逐步生成一个复杂的配置文件JSON，包含应用设置、用户偏好和系统配置。"
-            )
-        ]
+        stream_messages = [USER_APP_CONFIG_REQ]
         
         print("流式响应:")
         async for chunk in adapter.chat_completion_stream(
@@ -163,57 +347,40 @@ async def doubao_adapter_example():
     # 豆包API配置
     api_key = os.getenv('DOUBAO_API_KEY', 'mock-doubao-key')
     
-    config = ModelConfig(
-        model_type="doubao",
-        model_name="doubao-pro-4k",
-        api_key=api_key,
-        base_url="https://ark.cn-beijing.volces.com/api/v3",
-        timeout=30
-    )
+    config = replace(_BASE_CONFIGS["doubao"], api_key=api_key, timeout=30)
     
     print(f"豆包配置:")
     print(f"  模型: {config.model_name}")
     print(f"  端点: {config.base_url}")
     
     try:
+        from agently_format.adapters.doubao_adapter import DoubaoAdapter
+
         adapter = DoubaoAdapter(config)
-        
-        # 获取模型信息
-        model_info = await adapter.get_model_info()
+
+        # 中文聊天示例
+        messages = [SYSTEM_DATA_ANALYST, USER_SHOP_ITEM_REQ]
+
+        print(f"\n发送中文聊天请求...")
+
+        is_valid, model_info, response = await _run_provider_demo(
+            adapter,
+            messages,
+            temperature=0.8
+        )
+
         print(f"\n模型信息:")
         print(f"  提供商: {model_info.get('provider', 'Doubao')}")
         print(f"  支持中文: {model_info.get('supports_chinese', True)}")
         print(f"  上下文长度: {model_info.get('context_length', '4K')}")
-        
-        # 验证API密钥
-        is_valid = await adapter.validate_api_key()
+
         print(f"\nAPI密钥验证: {'✅ 有效' if is_valid else '❌ 无效'}")
-        
+
         if not is_valid:
             print("提示: 请设置有效的DOUBAO_API_KEY环境变量")
             await adapter.close()
             return
-        
-        # 中文聊天示例
-        messages = [
-            ChatMessage(
-                role="system",
-                content="你是一个专业的数据分析师，擅长处理和分析JSON格式的数据。"
-            ),
-            ChatMessage(
-                role="user",
-                content="请帮我生成一个电商网站的商品数据JSON结构，包含商品基本信息、价格、库存和评价数据。"
-            )
-        ]
-        
-        print(f"\n发送中文聊天请求...")
-        
-        response = await adapter.chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.8
-        )
-        
+
         print(f"\n豆包响应:")
         print(f"  内容长度: {len(response.content)} 字符")
         print(f"  模型: {response.model}")
@@ -230,27 +397,7 @@ async def custom_adapter_example():
     """自定义适配器示例"""
     print("\n=== 自定义适配器示例 ===")
     
-    # 自定义响应转换器
-    def custom_response_transformer(raw_response: Dict[str, Any]) -> Dict[str, Any]:
-        """自定义响应转换器"""
-        return {
-            "content": raw_response.get("text", ""),
-            "model": raw_response.get("model_id", "custom-model"),
-            "usage": {
-                "prompt_tokens": raw_response.get("input_tokens", 0),
-                "completion_tokens": raw_response.get("output_tokens", 0),
-                "total_tokens": raw_response.get("total_tokens", 0)
-            },
-            "finish_reason": raw_response.get("stop_reason", "stop")
-        }
-    
-    config = ModelConfig(
-        model_type="custom",
-        model_name="my-custom-model",
-        api_key="custom-api-key",
-        base_url="https://api.example.com/v1",
-        timeout=30
-    )
+    config = replace(_BASE_CONFIGS["custom"], timeout=30)
     
     print(f"自定义适配器配置:")
     print(f"  模型类型: {config.model_type}")
@@ -258,10 +405,12 @@ async def custom_adapter_example():
     print(f"  API端点: {config.base_url}")
     
     try:
+        from agently_format.adapters.custom_adapter import CustomAdapter
+
         # 创建自定义适配器
         adapter = CustomAdapter(
             config=config,
-            response_transformer=custom_response_transformer
+            response_transformer=_custom_response_transformer
         )
         
         print(f"\n自定义适配器创建成功")
@@ -288,33 +437,28 @@ async def custom_adapter_example():
 async def adapter_factory_example():
     """适配器工厂示例"""
     print("\n=== 适配器工厂示例 ===")
-    
+
+    from agently_format.adapters.factory import ModelAdapterFactory
+
     factory = ModelAdapterFactory()
     
     # 获取支持的模型类型
-    supported_models = factory.get_supported_models()
+    supported_models = frozenset(factory.get_supported_models())
     print(f"支持的模型类型: {supported_models}")
     
     # 注册自定义适配器
     def create_mock_adapter(config: ModelConfig) -> BaseModelAdapter:
         """创建模拟适配器"""
-        return CustomAdapter(config)
+        return _load_adapter_class(ModelType.CUSTOM)(config)
     
     factory.register_adapter("mock", create_mock_adapter)
-    print(f"\n注册自定义适配器后支持的模型: {factory.get_supported_models()}")
+    supported_models = frozenset(factory.get_supported_models())
+    print(f"\n注册自定义适配器后支持的模型: {supported_models}")
     
     # 创建不同类型的适配器
     configs = [
-        ModelConfig(
-            model_type="openai",
-            model_name="gpt-3.5-turbo",
-            api_key="mock-openai-key"
-        ),
-        ModelConfig(
-            model_type="doubao",
-            model_name="doubao-pro-4k",
-            api_key="mock-doubao-key"
-        ),
+        _BASE_CONFIGS["openai"],
+        _BASE_CONFIGS["doubao"],
         ModelConfig(
             model_type="mock",
             model_name="mock-model",
@@ -354,15 +498,13 @@ async def adapter_performance_example():
     print("\n=== 适配器性能示例 ===")
     
     import time
-    
+
+    from agently_format.adapters.factory import ModelAdapterFactory
+
     factory = ModelAdapterFactory()
     
     # 性能测试配置
-    config = ModelConfig(
-        model_type="openai",
-        model_name="gpt-3.5-turbo",
-        api_key="mock-key-for-performance-test"
-    )
+    config = replace(_BASE_CONFIGS["openai"], api_key="mock-key-for-performance-test")
     
     # 测试适配器创建性能
     print(f"测试适配器创建性能...")
@@ -417,14 +559,12 @@ async def adapter_integration_example():
     try:
         # 创建多个适配器
         configs = {
-            "openai": ModelConfig(
-                model_type="openai",
-                model_name="gpt-3.5-turbo",
+            "openai": replace(
+                _BASE_CONFIGS["openai"],
                 api_key=os.getenv('OPENAI_API_KEY', 'mock-openai-key')
             ),
-            "doubao": ModelConfig(
-                model_type="doubao",
-                model_name="doubao-pro-4k",
+            "doubao": replace(
+                _BASE_CONFIGS["doubao"],
                 api_key=os.getenv('DOUBAO_API_KEY', 'mock-doubao-key')
             )
         }
@@ -433,12 +573,10 @@ async def adapter_integration_example():
         
         for name, config in configs.items():
             try:
-                if config.model_type == "openai":
-                    adapter = OpenAIAdapter(config)
-                elif config.model_type == "doubao":
-                    adapter = DoubaoAdapter(config)
-                else:
+                if config.model_type not in _ADAPTER_MODULES:
                     continue
+
+                adapter = _load_adapter_class(config.model_type)(config)
                 
                 demo.adapters[name] = adapter
                 print(f"  ✅ {name} 适配器初始化成功")
@@ -449,10 +587,7 @@ async def adapter_integration_example():
         # 测试适配器功能
         print(f"\n测试适配器功能:")
         
-        test_message = ChatMessage(
-            role="user",
-            content="请生成一个简单的JSON示例"
-        )
+        test_message = USER_SIMPLE_JSON_REQ
         
         for name, adapter in demo.adapters.items():
             try:
@@ -494,31 +629,34 @@ async def wenxin_adapter_example():
     api_key = os.getenv('WENXIN_API_KEY', 'mock-wenxin-key')
     api_secret = os.getenv('WENXIN_SECRET_KEY', 'mock-wenxin-secret')
     
-    config = ModelConfig(
-        model_type="baidu",
-        model_name="ernie-4.0-8k",
-        api_key=api_key,
-        api_secret=api_secret,
-        base_url="https://aip.baidubce.com",
-        timeout=30
-    )
+    config = replace(_BASE_CONFIGS["baidu"], api_key=api_key, api_secret=api_secret, timeout=30)
     
     print(f"文心配置:")
     print(f"  模型: {config.model_name}")
     print(f"  端点: {config.base_url}")
     
     try:
+        from agently_format.adapters.wenxin_adapter import WenxinAdapter
+
         adapter = WenxinAdapter(config)
-        
-        # 获取模型信息
-        model_info = adapter.get_model_info()
+
+        # 中文聊天示例
+        messages = [SYSTEM_JSON_FORMATTER, USER_PRODUCT_REQ]
+
+        print(f"\n发送聊天请求...")
+
+        is_valid, model_info, response = await _run_provider_demo(
+            adapter,
+            messages,
+            temperature=0.7,
+            max_tokens=500
+        )
+
         print(f"\n模型信息:")
         print(f"  提供商: 百度")
         print(f"  支持中文: 是")
         print(f"  上下文长度: {model_info.get('context_window', '8K')}")
-        
-        # 验证API密钥
-        is_valid = await adapter.validate_api_key()
+
         print(f"\nAPI密钥验证: {'✅ 有效' if is_valid else '❌ 无效'}")
         
         if not is_valid:
@@ -526,27 +664,6 @@ async def wenxin_adapter_example():
             await adapter.close()
             return
         
-        # 中文聊天示例
-        messages = [
-            ChatMessage(
-                role="system",
-                content="你是一个专业的JSON数据处理专家，擅长生成和格式化各种JSON数据结构。"
-            ),
-            ChatMessage(
-                role="user",
-                content="请生成一个电商产品信息的JSON数据，包含产品名称、价格、分类、库存等信息。"
-            )
-        ]
-        
-        print(f"\n发送聊天请求...")
-        
-        response = await adapter.chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.7,
-            max_tokens=500
-        )
-        
         print(f"\n聊天响应:")
         print(f"  内容: {response.content[:200]}...")
         print(f"  模型: {response.model}")
@@ -565,30 +682,34 @@ async def qianwen_adapter_example():
     # 千问API配置
     api_key = os.getenv('QIANWEN_API_KEY', 'mock-qianwen-key')
     
-    config = ModelConfig(
-        model_type="qwen",
-        model_name="qwen-turbo",
-        api_key=api_key,
-        base_url="https://dashscope.aliyuncs.com/api/v1",
-        timeout=30
-    )
+    config = replace(_BASE_CONFIGS["qwen"], api_key=api_key, timeout=30)
     
     print(f"千问配置:")
     print(f"  模型: {config.model_name}")
     print(f"  端点: {config.base_url}")
     
     try:
+        from agently_format.adapters.qianwen_adapter import QianwenAdapter
+
         adapter = QianwenAdapter(config)
-        
-        # 获取模型信息
-        model_info = adapter.get_model_info()
+
+        # 聊天示例
+        messages = [USER_SETTINGS_REQ]
+
+        print(f"\n发送聊天请求...")
+
+        is_valid, model_info, response = await _run_provider_demo(
+            adapter,
+            messages,
+            temperature=0.5,
+            max_tokens=600
+        )
+
         print(f"\n模型信息:")
         print(f"  提供商: 阿里云")
         print(f"  支持中文: 是")
         print(f"  上下文长度: {model_info.get('context_window', '8K')}")
-        
-        # 验证API密钥
-        is_valid = await adapter.validate_api_key()
+
         print(f"\nAPI密钥验证: {'✅ 有效' if is_valid else '❌ 无效'}")
         
         if not is_valid:
@@ -596,23 +717,6 @@ async def qianwen_adapter_example():
             await adapter.close()
             return
         
-        # 聊天示例
-        messages = [
-            ChatMessage(
-                role="user",
-                content="请生成一个用户配置文件的JSON结构，包含个人信息、偏好设置和权限配置。"
-            )
-        ]
-        
-        print(f"\n发送聊天请求...")
-        
-        response = await adapter.chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.5,
-            max_tokens=600
-        )
-        
         print(f"\n聊天响应:")
         print(f"  内容: {response.content[:200]}...")
         print(f"  模型: {response.model}")
@@ -631,30 +735,34 @@ async def deepseek_adapter_example():
     # DeepSeek API配置
     api_key = os.getenv('DEEPSEEK_API_KEY', 'mock-deepseek-key')
     
-    config = ModelConfig(
-        model_type="deepseek",
-        model_name="deepseek-chat",
-        api_key=api_key,
-        base_url="https://api.deepseek.com/v1",
-        timeout=30
-    )
+    config = replace(_BASE_CONFIGS["deepseek"], api_key=api_key, timeout=30)
     
     print(f"DeepSeek配置:")
     print(f"  模型: {config.model_name}")
     print(f"  端点: {config.base_url}")
     
     try:
+        from agently_format.adapters.deepseek_adapter import DeepSeekAdapter
+
         adapter = DeepSeekAdapter(config)
-        
-        # 获取模型信息
-        model_info = adapter.get_model_info()
+
+        # 代码生成示例
+        messages = [USER_CODE_REQ]
+
+        print(f"\n发送聊天请求...")
+
+        is_valid, model_info, response = await _run_provider_demo(
+            adapter,
+            messages,
+            temperature=0.3,
+            max_tokens=800
+        )
+
         print(f"\n模型信息:")
         print(f"  提供商: DeepSeek")
         print(f"  擅长领域: 代码生成和推理")
         print(f"  上下文长度: {model_info.get('context_window', '4K')}")
-        
-        # 验证API密钥
-        is_valid = await adapter.validate_api_key()
+
         print(f"\nAPI密钥验证: {'✅ 有效' if is_valid else '❌ 无效'}")
         
         if not is_valid:
@@ -662,23 +770,6 @@ async def deepseek_adapter_example():
             await adapter.close()
             return
         
-        # 代码生成示例
-        messages = [
-            ChatMessage(
-                role="user",
-                content="请生成一个Python函数，用于解析和验证JSON配置文件，包含错误处理和类型检查。"
-            )
-        ]
-        
-        print(f"\n发送聊天请求...")
-        
-        response = await adapter.chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.3,
-            max_tokens=800
-        )
-        
         print(f"\n聊天响应:")
         print(f"  内容: {response.content[:200]}...")
         print(f"  模型: {response.model}")
@@ -697,30 +788,34 @@ async def kimi_adapter_example():
     # Kimi API配置
     api_key = os.getenv('KIMI_API_KEY', 'mock-kimi-key')
     
-    config = ModelConfig(
-        model_type="kimi",
-        model_name="moonshot-v1-8k",
-        api_key=api_key,
-        base_url="https://api.moonshot.cn/v1",
-        timeout=30
-    )
+    config = replace(_BASE_CONFIGS["kimi"], api_key=api_key, timeout=30)
     
     print(f"Kimi配置:")
     print(f"  模型: {config.model_name}")
     print(f"  端点: {config.base_url}")
     
     try:
+        from agently_format.adapters.kimi_adapter import KimiAdapter
+
         adapter = KimiAdapter(config)
-        
-        # 获取模型信息
-        model_info = adapter.get_model_info()
+
+        # 长文本处理示例
+        messages = [USER_API_DOC_REQ]
+
+        print(f"\n发送聊天请求...")
+
+        is_valid, model_info, response = await _run_provider_demo(
+            adapter,
+            messages,
+            temperature=0.6,
+            max_tokens=1000
+        )
+
         print(f"\n模型信息:")
         print(f"  提供商: 月之暗面")
         print(f"  支持长文本: 是")
         print(f"  上下文长度: {model_info.get('context_window', '8K')}")
-        
-        # 验证API密钥
-        is_valid = await adapter.validate_api_key()
+
         print(f"\nAPI密钥验证: {'✅ 有效' if is_valid else '❌ 无效'}")
         
         if not is_valid:
@@ -728,23 +823,6 @@ async def kimi_adapter_example():
             await adapter.close()
             return
         
-        # 长文本处理示例
-        messages = [
-            ChatMessage(
-                role="user",
-                content="请生成一个完整的API文档JSON结构，包含端点定义、参数说明、响应格式和错误代码。"
-            )
-        ]
-        
-        print(f"\n发送聊天请求...")
-        
-        response = await adapter.chat_completion(
-            messages=messages,
-            stream=False,
-            temperature=0.6,
-            max_tokens=1000
-        )
-        
         print(f"\n聊天响应:")
         print(f"  内容: {response.content[:200]}...")
         print(f"  模型: {response.model}")
@@ -762,13 +840,25 @@ async def main():
     print("=" * 50)
     
     try:
-        await openai_adapter_example()
-        await doubao_adapter_example()
-        await wenxin_adapter_example()
-        await qianwen_adapter_example()
-        await deepseek_adapter_example()
-        await kimi_adapter_example()
-        await custom_adapter_example()
+        # 各提供商示例互不依赖，限流并发执行
+        provider_examples = [
+            openai_adapter_example,
+            doubao_adapter_example,
+            wenxin_adapter_example,
+            qianwen_adapter_example,
+            deepseek_adapter_example,
+            kimi_adapter_example,
+            custom_adapter_example,
+        ]
+        semaphore = asyncio.Semaphore(4)
+
+        async def run_example(example):
+            async with semaphore:
+                await example()
+
+        await asyncio.gather(*(run_example(example) for example in provider_examples))
+
+        # 工厂、性能和集成示例共享状态，保持顺序执行
         await adapter_factory_example()
         await adapter_performance_example()
         await adapter_integration_example()
@@ -794,5 +884,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    # 安装了uvloop时使用更快的事件循环（uvloop不支持Windows）
+    use_uvloop()
+
     # 运行示例
     asyncio.run(main())
\ No newline at end of file
@@ -16,6 +16,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from agently_format.types.models import ModelConfig, ModelType
 from agently_format.adapters.doubao_adapter import DoubaoAdapter
 
+# JSON结构字符，用于检查过滤后的输出是否仍带有格式残留
+_JSON_CHARS = frozenset('{}[]",:')
+
 async def simple_field_filtering_test():
     """
     简单的字段过滤测试
@@ -62,8 +65,8 @@ async def simple_field_filtering_test():
         
         print("\n\n--- 输出分析 ---")
         print(f"输出长度: {len(output_content)}")
-        json_chars = '{}[]",:'
-        has_json_chars = any(c in output_content for c in json_chars)
+        # 先做廉价的字符集检查，再做字段名的子串搜索
+        has_json_chars = not _JSON_CHARS.isdisjoint(output_content)
         print(f"是否包含JSON格式字符: {'是' if has_json_chars else '否'}")
         print(f"是否包含字段名: {'是' if 'description' in output_content else '否'}")
         
@@ -1,25 +1,71 @@
 """流式处理示例
 
 演示如何使用AgentlyFormat进行流式JSON解析和处理。
+
+可选安装orjson和uvloop（pip install "AgentlyFormat[speedups]"）以获得更快的
+JSON序列化和事件循环。
 """
 
 import asyncio
+import codecs
+import io
 import json
+import logging
 import time
-from typing import List, Dict, Any, Optional
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, DefaultDict, Deque, Iterable, Iterator, Optional, Tuple
 
+from agently_format.adapters import use_uvloop
 from agently_format.core.streaming_parser import StreamingParser
 from agently_format.core.event_system import EventEmitter
 from agently_format.types import ParseEvent, ParseEventType
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson为可选加速依赖
+    orjson = None
+
+
+def dumps_utf8(obj: Any) -> bytes:
+    """将对象序列化为UTF-8编码的JSON字节
+    
+    安装了orjson时使用orjson，否则回退到标准库json。
+    
+    Args:
+        obj: 要序列化的对象
+        
+    Returns:
+        bytes: JSON字节数据
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 
 class StreamingDemo:
     """流式处理演示类"""
     
-    def __init__(self):
+    def __init__(self, silent: bool = False):
+        """初始化演示
+        
+        Args:
+            silent: 静默模式，只统计事件数量而不注册打印处理器，
+                用于性能测试，避免输出开销影响测量结果
+        """
         self.event_emitter = EventEmitter()
         self.parser = StreamingParser(self.event_emitter)
-        self.received_events: List[ParseEvent] = []
+        # 事件只追加和遍历，使用deque避免列表扩容时的整体复制
+        self.received_events: Deque[ParseEvent] = deque()
+        # 按事件类型建立索引，查询某类事件时无需遍历全部事件
+        self.events_by_type: DefaultDict[ParseEventType, List[ParseEvent]] = defaultdict(list)
+        self.event_count = 0
+        
+        if silent:
+            self.event_emitter.on_any(self._count_event)
+            return
         
         # 注册事件监听器
         self.event_emitter.on('parse_start', self._on_parse_start)
@@ -33,71 +79,199 @@ class StreamingDemo:
         self.event_emitter.on('key_found', self._on_key_found)
         self.event_emitter.on('value_found', self._on_value_found)
     
+    def _record(self, event: ParseEvent):
+        """记录事件并更新类型索引"""
+        self.received_events.append(event)
+        self.events_by_type[event.event_type].append(event)
+    
+    def _count_event(self, event: ParseEvent):
+        """静默模式下的事件计数"""
+        self.event_count += 1
+    
     def _on_parse_start(self, event: ParseEvent):
         """解析开始事件"""
-        self.received_events.append(event)
-        print(f"🚀 解析开始 - 会话: {event.session_id}")
+        self._record(event)
+        logger.debug("🚀 解析开始 - 会话: %s", event.session_id)
     
     def _on_parse_progress(self, event: ParseEvent):
         """解析进度事件"""
-        self.received_events.append(event)
-        progress = event.data.get('progress', 0)
-        print(f"📊 解析进度: {progress:.1%}")
+        self._record(event)
+        logger.debug("📊 解析进度: %.1f%%", event.data.get('progress', 0) * 100)
     
     def _on_parse_complete(self, event: ParseEvent):
         """解析完成事件"""
-        self.received_events.append(event)
-        print(f"✅ 解析完成 - 耗时: {event.data.get('duration', 0):.3f}秒")
+        self._record(event)
+        logger.debug("✅ 解析完成 - 耗时: %.3f秒", event.data.get('duration', 0))
     
     def _on_parse_error(self, event: ParseEvent):
         """解析错误事件"""
-        self.received_events.append(event)
-        error = event.data.get('error', 'Unknown error')
-        print(f"❌ 解析错误: {error}")
+        self._record(event)
+        logger.debug("❌ 解析错误: %s", event.data.get('error', 'Unknown error'))
     
     def _on_object_start(self, event: ParseEvent):
         """对象开始事件"""
-        self.received_events.append(event)
-        path = event.data.get('path', '')
-        print(f"🔷 对象开始: {path}")
+        self._record(event)
+        logger.debug("🔷 对象开始: %s", event.data.get('path', ''))
     
     def _on_object_end(self, event: ParseEvent):
         """对象结束事件"""
-        self.received_events.append(event)
-        path = event.data.get('path', '')
-        print(f"🔶 对象结束: {path}")
+        self._record(event)
+        logger.debug("🔶 对象结束: %s", event.data.get('path', ''))
     
     def _on_array_start(self, event: ParseEvent):
         """数组开始事件"""
-        self.received_events.append(event)
-        path = event.data.get('path', '')
-        print(f"📋 数组开始: {path}")
+        self._record(event)
+        logger.debug("📋 数组开始: %s", event.data.get('path', ''))
     
     def _on_array_end(self, event: ParseEvent):
         """数组结束事件"""
-        self.received_events.append(event)
-        path = event.data.get('path', '')
-        length = event.data.get('length', 0)
-        print(f"📄 数组结束: {path} (长度: {length})")
+        self._record(event)
+        logger.debug(
+            "📄 数组结束: %s (长度: %s)",
+            event.data.get('path', ''), event.data.get('length', 0)
+        )
     
     def _on_key_found(self, event: ParseEvent):
         """键发现事件"""
-        self.received_events.append(event)
-        key = event.data.get('key', '')
-        path = event.data.get('path', '')
-        print(f"🔑 发现键: '{key}' at {path}")
+        self._record(event)
+        logger.debug(
+            "🔑 发现键: '%s' at %s",
+            event.data.get('key', ''), event.data.get('path', '')
+        )
     
     def _on_value_found(self, event: ParseEvent):
         """值发现事件"""
-        self.received_events.append(event)
-        value = event.data.get('value')
-        path = event.data.get('path', '')
-        value_type = type(value).__name__
-        print(f"💎 发现值: {value} ({value_type}) at {path}")
+        self._record(event)
+        if logger.isEnabledFor(logging.DEBUG):
+            value = event.data.get('value')
+            logger.debug(
+                "💎 发现值: %s (%s) at %s",
+                value, type(value).__name__, event.data.get('path', '')
+            )
     
     def clear_events(self):
         """清空事件记录"""
         self.received_events.clear()
+        self.events_by_type.clear()
+
+
+def iter_utf8_chunks(buf: bytes, chunk_size: int) -> Iterator[str]:
+    """按固定字节数切分UTF-8缓冲区，逐块解码
+    
+    使用memoryview避免切片复制，增量解码器保证多字节字符不会被截断。
+    
+    Args:
+        buf: UTF-8编码的字节数据
+        chunk_size: 每块字节数
+        
+    Yields:
+        str: 解码后的文本块
+    """
+    view = memoryview(buf)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    last = len(view)
+    for start in range(0, last, chunk_size):
+        end = start + chunk_size
+        yield decoder.decode(view[start:end], final=end >= last)
+
+
+@lru_cache(maxsize=None)
+def build_users_payload(user_count: int) -> Tuple[Dict[str, Any], bytes]:
+    """构造性能测试用的用户数据及其JSON字节
+    
+    结果按用户数量缓存，多次运行性能测试时只生成一次。偏好设置只有
+    少量组合，按组合复用同一个字典。
+    
+    Args:
+        user_count: 用户数量
+        
+    Returns:
+        Tuple[Dict[str, Any], bytes]: 用户数据和对应的UTF-8 JSON字节
+    """
+    preferences = {
+        (theme, notifications, language): {
+            "theme": theme,
+            "notifications": notifications,
+            "language": language
+        }
+        for theme in ("dark", "light")
+        for notifications in (True, False)
+        for language in ("en", "zh")
+    }
+    data = {
+        "users": [
+            {
+                "id": i,
+                "name": f"User{i}",
+                "email": f"user{i}@example.com",
+                "profile": {
+                    "age": 20 + (i % 50),
+                    "city": f"City{i % 10}",
+                    "preferences": preferences[(
+                        "dark" if i % 2 == 0 else "light",
+                        i % 3 == 0,
+                        "en" if i % 4 == 0 else "zh"
+                    )]
+                }
+            }
+            for i in range(user_count)
+        ],
+        "metadata": {
+            "total_users": user_count,
+            "generated_at": "2024-01-15T10:30:00Z",
+            "version": "1.0"
+        }
+    }
+    return data, dumps_utf8(data)
+
+
+async def pipelined_parse(
+    parser: StreamingParser,
+    session_id: str,
+    chunks: Iterable[str],
+    chunk_count: int,
+    delay: float = 0.0,
+    on_chunk: Optional[Callable[[int, str, List[Any]], None]] = None,
+    max_pending: int = 4
+) -> None:
+    """以生产者/消费者方式解析数据块
+    
+    生产者模拟网络接收，消费者负责解析，两者通过有界队列并发运行，
+    使接收下一块的等待时间与当前块的解析时间重叠。
+    
+    Args:
+        parser: 流式解析器
+        session_id: 会话ID
+        chunks: 数据块序列
+        chunk_count: 数据块总数，用于标记最后一块
+        delay: 每块的模拟网络延迟（秒）
+        on_chunk: 每块解析完成后的回调，参数为块序号、块内容和事件列表
+        max_pending: 队列中最多缓存的待解析块数
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    
+    async def feed():
+        for item in enumerate(chunks):
+            if delay:
+                await asyncio.sleep(delay)
+            await queue.put(item)
+        await queue.put(None)
+    
+    async def consume():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            i, chunk = item
+            events = await parser.parse_chunk(
+                chunk=chunk,
+                session_id=session_id,
+                is_final=(i == chunk_count - 1)
+            )
+            if on_chunk:
+                on_chunk(i, chunk, events)
+    
+    await asyncio.gather(feed(), consume())
 
 
 async def simple_streaming_example():
@@ -123,19 +297,9 @@ async def simple_streaming_example():
     
     print(f"开始解析 {len(json_chunks)} 个数据块...\n")
     
-    for i, chunk in enumerate(json_chunks):
+    def report(i: int, chunk: str, events: List[Any]):
         print(f"处理块 {i + 1}: '{chunk}'")
         
-        # 模拟网络延迟
-        await asyncio.sleep(0.1)
-        
-        # 解析块
-        events = await demo.parser.parse_chunk(
-            chunk=chunk,
-            session_id=session_id,
-            is_final=(i == len(json_chunks) - 1)
-        )
-        
         # 获取解析状态
         state = demo.parser.get_session_state(session_id)
         
@@ -149,6 +313,12 @@ async def simple_streaming_example():
             print(f"  完成: 未知")
         print()
     
+    # 模拟网络延迟，与解析重叠进行
+    await pipelined_parse(
+        demo.parser, session_id, json_chunks, len(json_chunks),
+        delay=0.1, on_chunk=report
+    )
+    
     # 获取最终结果
     final_data = demo.parser.get_current_data(session_id)
     if final_data:
@@ -197,9 +367,12 @@ async def complex_streaming_example():
     }
     
     # 将JSON转换为字符串并分块
-    json_str = json.dumps(complex_json, ensure_ascii=False)
+    json_str = dumps_utf8(complex_json).decode("utf-8")
     chunk_size = 50  # 每块50个字符
-    chunks = [json_str[i:i+chunk_size] for i in range(0, len(json_str), chunk_size)]
+    chunk_count = -(-len(json_str) // chunk_size)
+    # 按需从缓冲区读取，不预先构建全部分块
+    reader = io.StringIO(json_str)
+    chunks = iter(lambda: reader.read(chunk_size), "")
     
     session_id = "complex-demo"
     
@@ -207,23 +380,14 @@ async def complex_streaming_example():
     demo.parser.create_session(session_id)
     
     print(f"原始JSON大小: {len(json_str)} 字符")
-    print(f"分为 {len(chunks)} 个块进行处理...\n")
+    print(f"分为 {chunk_count} 个块进行处理...\n")
     
     start_time = time.time()
     
-    for i, chunk in enumerate(chunks):
-        print(f"块 {i + 1}/{len(chunks)}: {len(chunk)} 字符")
-        
-        # 模拟网络传输延迟
-        await asyncio.sleep(0.05)
+    def report(i: int, chunk: str, events: List[Any]):
+        print(f"块 {i + 1}/{chunk_count}: {len(chunk)} 字符")
         
-        events = await demo.parser.parse_chunk(
-            chunk=chunk,
-            session_id=session_id,
-            is_final=(i == len(chunks) - 1)
-        )
-        
-        if i % 5 == 0 or i == len(chunks) - 1:  # 每5块显示一次进度
+        if i % 5 == 0 or i == chunk_count - 1:  # 每5块显示一次进度
             state = demo.parser.get_session_state(session_id)
             if state:
                 progress = state.processed_chunks / state.total_chunks if state.total_chunks > 0 else 0
@@ -231,6 +395,12 @@ async def complex_streaming_example():
             else:
                 print(f"  进度: 未知")
     
+    # 模拟网络传输延迟，与解析重叠进行
+    await pipelined_parse(
+        demo.parser, session_id, chunks, chunk_count,
+        delay=0.05, on_chunk=report
+    )
+    
     end_time = time.time()
     
     # 获取解析结果
@@ -297,7 +467,7 @@ async def error_handling_example():
         print()
     
     # 检查错误事件
-    error_events = [e for e in demo.received_events if e.event_type == ParseEventType.PARSE_ERROR]
+    error_events = demo.events_by_type[ParseEventType.ERROR]
     print(f"捕获到 {len(error_events)} 个错误事件")
     
     for event in error_events:
@@ -308,39 +478,12 @@ async def performance_streaming_example():
     """性能测试示例"""
     print("\n=== 性能测试示例 ===")
     
-    demo = StreamingDemo()
-    demo.clear_events()
-    
-    # 生成大量数据
-    large_data = {
-        "users": [
-            {
-                "id": i,
-                "name": f"User{i}",
-                "email": f"user{i}@example.com",
-                "profile": {
-                    "age": 20 + (i % 50),
-                    "city": f"City{i % 10}",
-                    "preferences": {
-                        "theme": "dark" if i % 2 == 0 else "light",
-                        "notifications": i % 3 == 0,
-                        "language": "en" if i % 4 == 0 else "zh"
-                    }
-                }
-            }
-            for i in range(100)  # 100个用户
-        ],
-        "metadata": {
-            "total_users": 100,
-            "generated_at": "2024-01-15T10:30:00Z",
-            "version": "1.0"
-        }
-    }
+    demo = StreamingDemo(silent=True)
     
-    # 转换为JSON字符串并分块
-    json_str = json.dumps(large_data, ensure_ascii=False)
-    chunk_size = 1000  # 每块1000字符
-    chunks = [json_str[i:i+chunk_size] for i in range(0, len(json_str), chunk_size)]
+    # 生成大量数据，同时得到编码后的字节，按块惰性切分
+    large_data, buf = build_users_payload(100)
+    chunk_size = 1000  # 每块1000字节
+    chunk_count = -(-len(buf) // chunk_size)
     
     session_id = "performance-demo"
     
@@ -348,44 +491,43 @@ async def performance_streaming_example():
     demo.parser.create_session(session_id)
     
     print(f"性能测试数据:")
-    print(f"  JSON大小: {len(json_str):,} 字符")
+    print(f"  JSON大小: {len(buf):,} 字节")
     print(f"  用户数量: {len(large_data['users'])}")
-    print(f"  分块数量: {len(chunks)}")
-    print(f"  平均块大小: {len(json_str) // len(chunks)} 字符")
+    print(f"  分块数量: {chunk_count}")
+    print(f"  平均块大小: {len(buf) // chunk_count} 字节")
     print()
     
-    start_time = time.time()
-    
-    # 处理所有块
-    for i, chunk in enumerate(chunks):
-        events = await demo.parser.parse_chunk(
-            chunk=chunk,
-            session_id=session_id,
-            is_final=(i == len(chunks) - 1)
-        )
-        
+    def report(i: int, chunk: str, events: List[Any]):
         # 每10块显示一次进度
-        if i % 10 == 0 or i == len(chunks) - 1:
+        if i % 10 == 0 or i == chunk_count - 1:
             state = demo.parser.get_session_state(session_id)
             if state:
                 progress = state.processed_chunks / state.total_chunks if state.total_chunks > 0 else 0
-                print(f"进度: {i + 1}/{len(chunks)} ({progress:.1%})")
+                print(f"进度: {i + 1}/{chunk_count} ({progress:.1%})")
             else:
-                print(f"进度: {i + 1}/{len(chunks)} (未知)")
+                print(f"进度: {i + 1}/{chunk_count} (未知)")
+    
+    start_time = time.time()
+    
+    # 处理所有块
+    await pipelined_parse(
+        demo.parser, session_id, iter_utf8_chunks(buf, chunk_size), chunk_count,
+        on_chunk=report
+    )
     
     end_time = time.time()
     
     # 性能统计
     total_time = end_time - start_time
-    chars_per_second = len(json_str) / total_time
-    chunks_per_second = len(chunks) / total_time
+    bytes_per_second = len(buf) / total_time
+    chunks_per_second = chunk_count / total_time
     
     print(f"\n性能统计:")
     print(f"  总耗时: {total_time:.3f}秒")
-    print(f"  处理速度: {chars_per_second:,.0f} 字符/秒")
+    print(f"  处理速度: {bytes_per_second:,.0f} 字节/秒")
     print(f"  块处理速度: {chunks_per_second:.1f} 块/秒")
-    print(f"  事件数量: {len(demo.received_events)}")
-    print(f"  平均每块事件: {len(demo.received_events) / len(chunks):.1f}")
+    print(f"  事件数量: {demo.event_count}")
+    print(f"  平均每块事件: {demo.event_count / chunk_count:.1f}")
     
     # 验证结果
     final_data = demo.parser.get_current_data(session_id)
@@ -393,6 +535,22 @@ async def performance_streaming_example():
         print("✅ 大数据解析验证通过")
     else:
         print("❌ 大数据解析验证失败")
+    
+    # 对比：所有块已到达时批量解析，只解析一次合并后的内容
+    batch_session_id = demo.parser.create_session("performance-demo-batch")
+    start_time = time.time()
+    await demo.parser.parse_chunks(
+        batch_session_id, iter_utf8_chunks(buf, chunk_size), is_final=True
+    )
+    batch_time = time.time() - start_time
+    
+    print(f"\n批量解析:")
+    print(f"  总耗时: {batch_time:.3f}秒")
+    print(f"  处理速度: {len(buf) / batch_time:,.0f} 字节/秒")
+    if demo.parser.get_current_data(batch_session_id) == large_data:
+        print("✅ 批量解析验证通过")
+    else:
+        print("❌ 批量解析验证失败")
 
 
 async def multi_session_example():
@@ -420,24 +578,27 @@ async def multi_session_example():
     
     print(f"启动 {len(sessions_data)} 个并发会话...\n")
     
-    async def process_session(session_id: str, chunks: List[str]):
-        """处理单个会话"""
-        # 创建解析会话
-        demo.parser.create_session(session_id)
+    async def process_session(session_id: str, chunks: List[str]) -> Optional[Dict[str, Any]]:
+        """处理单个会话，每个会话使用独立的解析器，互不共享状态"""
+        parser = StreamingParser()
+        parser.create_session(session_id)
         
         print(f"会话 {session_id} 开始处理 {len(chunks)} 个块")
         
+        # 模拟不同的处理速度，每个会话的延迟只计算一次
+        delay = 0.1 + (hash(session_id) % 3) * 0.05
+        
         for i, chunk in enumerate(chunks):
-            events = await demo.parser.parse_chunk(
+            events = await parser.parse_chunk(
                 chunk=chunk,
                 session_id=session_id,
                 is_final=(i == len(chunks) - 1)
             )
             
-            # 模拟不同的处理速度
-            await asyncio.sleep(0.1 + (hash(session_id) % 3) * 0.05)
+            await asyncio.sleep(delay)
         
         print(f"会话 {session_id} 处理完成")
+        return parser.get_current_data(session_id)
     
     # 并发处理所有会话
     start_time = time.time()
@@ -447,7 +608,7 @@ async def multi_session_example():
         for session_id, chunks in sessions_data.items()
     ]
     
-    await asyncio.gather(*tasks)
+    results = await asyncio.gather(*tasks)
     
     end_time = time.time()
     
@@ -455,8 +616,7 @@ async def multi_session_example():
     
     # 检查每个会话的结果
     print("\n会话结果:")
-    for session_id in sessions_data.keys():
-        data = demo.parser.get_current_data(session_id)
+    for session_id, data in zip(sessions_data, results):
         if data:
             print(f"  {session_id}: {data['type']} - ✅")
         else:
@@ -502,5 +662,12 @@ async def main():
 
 
 if __name__ == "__main__":
+    # 事件处理器通过logging输出，交互运行时显示本示例的DEBUG日志
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.DEBUG)
+    
+    # 安装了uvloop时使用更快的事件循环（uvloop不支持Windows）
+    use_uvloop()
+    
     # 运行示例
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(), debug=False)
\ No newline at end of file
@@ -6,8 +6,47 @@
 """
 
 import asyncio
+import codecs
+import io
 import json
+import sys
+from agently_format.adapters import use_uvloop
 from agently_format.adapters.doubao_adapter import DoubaoAdapter
+from agently_format.core.incremental_parser import IncrementalJsonParser, compile_field_spec
+
+try:
+    import orjson
+except ImportError:  # orjson为可选加速依赖
+    orjson = None
+
+
+def dumps_utf8(obj) -> bytes:
+    """将对象序列化为UTF-8编码的JSON字节，安装了orjson时使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_text(obj) -> str:
+    """将对象序列化为JSON文本，安装了orjson时使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+loads = orjson.loads if orjson is not None else json.loads
+
+# 模拟流式输出的分块字节数，与64字节缓存行对齐
+CHUNK_SIZE = 64
+# 合并多个SSE帧后一次输出的字节阈值，减少消费端的事件循环切换次数
+FLUSH_BYTES = 4096
+# SSE数据帧的固定前后缀，内容部分单独做JSON转义
+SSE_PREFIX = 'data: {"choices":[{"delta":{"content":'
+SSE_SUFFIX = '}}]}\n\n'
+SSE_DATA = 'data: '
+SSE_DONE = '[DONE]'
+# 过滤结果中字段值之间的分隔符
+NEWLINE = "\n"
 
 # 测试数据
 test_json = {
@@ -36,6 +75,10 @@ test_json = {
     ]
 }
 
+# 测试数据只编码一次，各个测试共用；分块时对memoryview切片，不复制数据
+_TEST_JSON_BYTES = dumps_utf8(test_json)
+_TEST_JSON_VIEW = memoryview(_TEST_JSON_BYTES)
+
 class MockDoubaoAdapter(DoubaoAdapter):
     """模拟DoubaoAdapter用于测试"""
     
@@ -47,107 +90,154 @@ class MockDoubaoAdapter(DoubaoAdapter):
     
     async def _stream_request(self, endpoint, payload, headers):
         """模拟流式请求，返回测试数据"""
-        json_str = json.dumps(test_json, ensure_ascii=False)
+        # 固定字节分块可能截断多字节字符，由增量解码器在块间续接
+        decoder = codecs.getincrementaldecoder("utf-8")()
         
-        # 模拟流式输出，每次输出一小部分
-        chunk_size = 50
-        for i in range(0, len(json_str), chunk_size):
-            chunk = json_str[i:i + chunk_size]
-            yield f'data: {{"choices":[{{"delta":{{"content":"{chunk}"}}}}]}}\n\n'
+        # 模拟流式输出，每次输出一小部分，攒够FLUSH_BYTES后批量交给消费端
+        frames = []
+        pending = 0
+        for i in range(0, len(_TEST_JSON_VIEW), CHUNK_SIZE):
+            chunk = decoder.decode(_TEST_JSON_VIEW[i:i + CHUNK_SIZE])
+            if chunk:
+                frame = SSE_PREFIX + dumps_text(chunk) + SSE_SUFFIX
+                frames.append(frame)
+                pending += len(frame)
+                if pending >= FLUSH_BYTES:
+                    yield "".join(frames)
+                    frames.clear()
+                    pending = 0
         
-        yield 'data: [DONE]\n\n'
+        frames.append(SSE_DATA + SSE_DONE + '\n\n')
+        yield "".join(frames)
     
     def _parse_stream_chunk(self, line):
-        """解析流式数据块"""
-        if line.startswith('data: ') and not line.strip().endswith('[DONE]'):
+        """解析流式数据块，一个数据块可能包含多个SSE帧"""
+        contents = []
+        for frame in line.split('\n\n'):
+            # 定长前缀比较，结束标记只与数据部分比较
+            if frame[:6] != SSE_DATA or frame[6:].rstrip() == SSE_DONE:
+                continue
             try:
-                data = json.loads(line[6:])
-                if 'choices' in data and len(data['choices']) > 0:
-                    delta = data['choices'][0].get('delta', {})
-                    return delta.get('content', '')
-            except:
-                pass
-        return None
+                data = loads(frame[6:])
+            except ValueError:
+                # json和orjson的JSONDecodeError都是ValueError的子类
+                continue
+            choices = data.get('choices')
+            if choices:
+                contents.append(choices[0].get('delta', {}).get('content', ''))
+        return "".join(contents) or None
+    
+    async def stream_with_multi_filter(self, payload, headers, filters):
+        """一次流式请求同时应用多组字段过滤
+        
+        响应只读取和解析一次，每个解析出的值依次交给各组过滤条件判断。
+        
+        Args:
+            payload: 请求载荷
+            headers: 请求头
+            filters: 过滤条件列表，每项为 (include_fields, exclude_fields)
+            
+        Yields:
+            List[str]: 与filters一一对应的本批过滤后内容，没有输出的过滤条件为空串
+        """
+        specs = []
+        for include_fields, exclude_fields in filters:
+            fields = include_fields or exclude_fields
+            specs.append((compile_field_spec(tuple(fields)) if fields else None, bool(include_fields)))
+        emitted = [0] * len(specs)
+        
+        event_batches = self._iter_json_events(payload, headers, IncrementalJsonParser(), [])
+        try:
+            async for events in event_batches:
+                if not events:
+                    continue
+                # 每个值只转换一次文本，供选中它的各组过滤条件共用
+                texts = [None] * len(events)
+                outputs = []
+                for index, (field_spec, include_mode) in enumerate(specs):
+                    parts = []
+                    for position, (segments, value) in enumerate(events):
+                        if not self._is_field_selected(segments, field_spec, include_mode):
+                            continue
+                        if emitted[index]:
+                            parts.append(NEWLINE)  # 字段间换行
+                        emitted[index] += 1
+                        text = texts[position]
+                        if text is None:
+                            text = texts[position] = value if value.__class__ is str else str(value)
+                        parts.append(text)
+                    outputs.append("".join(parts))
+                yield outputs
+        finally:
+            await event_batches.aclose()
 
-async def test_exclude_fields():
-    """测试排除字段功能"""
-    print("\n=== 测试排除字段 (exclude year, creator) ===")
-    
-    adapter = MockDoubaoAdapter()
-    
-    result = []
-    async for chunk in adapter._stream_with_field_filtering(
-        payload={},
-        headers={},
-        include_fields=None,
-        exclude_fields=["year", "creator"]
-    ):
-        result.append(chunk)
-        print(chunk, end='', flush=True)
-    
-    print("\n=== 排除字段测试完成 ===")
-    return ''.join(result)
+# 三组过滤条件：(名称, include_fields, exclude_fields)
+FILTER_CASES = [
+    ("排除字段 (exclude year, creator)", None, ["year", "creator"]),
+    ("包含字段 (include name, description)", ["name", "description"], None),
+    ("嵌套字段过滤 (include languages[0].name, languages[1].description)",
+     ["languages[0].name", "languages[1].description"], None),
+]
 
-async def test_include_fields():
-    """测试包含字段功能"""
-    print("\n=== 测试包含字段 (include name, description) ===")
-    
-    adapter = MockDoubaoAdapter()
-    
-    result = []
-    async for chunk in adapter._stream_with_field_filtering(
-        payload={},
-        headers={},
-        include_fields=["name", "description"],
-        exclude_fields=None
-    ):
-        result.append(chunk)
-        print(chunk, end='', flush=True)
+async def test_field_filters():
+    """在同一次流式响应上同时测试多组字段过滤
     
-    print("\n=== 包含字段测试完成 ===")
-    return ''.join(result)
-
-async def test_nested_field_filtering():
-    """测试嵌套字段过滤"""
-    print("\n=== 测试嵌套字段过滤 (include languages[0].name, languages[1].description) ===")
+    响应只读取和解析一次，每个解析出的值分别交给各组过滤条件。
     
+    Returns:
+        List[str]: 与FILTER_CASES一一对应的过滤结果
+    """
     adapter = MockDoubaoAdapter()
     
-    result = []
-    async for chunk in adapter._stream_with_field_filtering(
+    results = [io.StringIO() for _ in FILTER_CASES]
+    async for outputs in adapter.stream_with_multi_filter(
         payload={},
         headers={},
-        include_fields=["languages[0].name", "languages[1].description"],
-        exclude_fields=None
+        filters=[(include, exclude) for _, include, exclude in FILTER_CASES]
     ):
-        result.append(chunk)
-        print(chunk, end='', flush=True)
+        for result, output in zip(results, outputs):
+            result.write(output)
+    
+    # 各组结果拼成一份报告后一次性写出并刷新
+    report = io.StringIO()
+    for (name, _, _), result in zip(FILTER_CASES, results):
+        report.write(f"\n=== 测试{name} ===\n{result.getvalue()}\n=== 测试完成 ===\n")
+    sys.stdout.write(report.getvalue())
+    sys.stdout.flush()
     
-    print("\n=== 嵌套字段过滤测试完成 ===")
-    return ''.join(result)
+    return [result.getvalue() for result in results]
 
 async def main():
     """主测试函数"""
     print("=== 字段过滤功能全面测试 ===")
     print(f"测试数据: {json.dumps(test_json, ensure_ascii=False, indent=2)}")
     
-    # 测试1: 排除字段
-    exclude_result = await test_exclude_fields()
-    
-    # 测试2: 包含字段
-    include_result = await test_include_fields()
-    
-    # 测试3: 嵌套字段过滤
-    nested_result = await test_nested_field_filtering()
+    # 排除字段、包含字段、嵌套字段过滤共用一次流式解析
+    exclude_result, include_result, nested_result = await test_field_filters()
     
     print("\n=== 所有测试完成 ===")
     
     # 验证结果
+    # 输出为逐行的字段值，按行与测试数据中对应字段的值逐一比较，
+    # 避免子串检查在其他字段的值中误命中
+    languages = test_json["languages"]
+    exclude_expected = [
+        str(value) for language in languages
+        for key, value in language.items() if key not in ("year", "creator")
+    ]
+    include_expected = [
+        str(value) for language in languages
+        for key, value in language.items() if key in ("name", "description")
+    ]
+    nested_expected = [languages[0]["name"], languages[1]["description"]]
+    
     print("\n=== 结果验证 ===")
-    print(f"排除字段结果包含'year': {'year' in exclude_result}")
-    print(f"排除字段结果包含'creator': {'creator' in exclude_result}")
-    print(f"排除字段结果包含'name': {'name' in exclude_result}")
-    print(f"排除字段结果包含'description': {'description' in exclude_result}")
+    print(f"排除字段结果正确: {exclude_result.split(NEWLINE) == exclude_expected}")
+    print(f"包含字段结果正确: {include_result.split(NEWLINE) == include_expected}")
+    print(f"嵌套字段结果正确: {nested_result.split(NEWLINE) == nested_expected}")
     
 if __name__ == "__main__":
+    # 安装了uvloop时使用更快的事件循环（uvloop不支持Windows）
+    use_uvloop()
+    
     asyncio.run(main())
\ No newline at end of file
@@ -3,7 +3,7 @@
 包含各种大模型的适配器实现，支持OpenAI、文心大模型、千问、豆包、DeepSeek、Kimi等模型。
 """
 
-from .model_adapter import ModelAdapter, BaseModelAdapter
+from .model_adapter import ModelAdapter, BaseModelAdapter, use_uvloop
 from .openai_adapter import OpenAIAdapter
 from .doubao_adapter import DoubaoAdapter
 from .wenxin_adapter import WenxinAdapter
@@ -24,4 +24,5 @@ __all__ = [
     "KimiAdapter",
     "CustomAdapter",
     "ModelAdapterFactory",
+    "use_uvloop",
 ]
\ No newline at end of file
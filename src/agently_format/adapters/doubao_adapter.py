@@ -3,24 +3,65 @@
 实现字节跳动豆包API的适配器。
 """
 
-import json
+import asyncio
 import copy
-from typing import Any, Dict, List, Optional, AsyncGenerator, Union, Awaitable
-import aiohttp
+import json
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, AsyncGenerator, Tuple, Union, Awaitable
 
 from .model_adapter import BaseModelAdapter, ModelResponse
 from ..types.models import ModelType
 from ..core.streaming_parser import parse_json_stream_with_fields, FieldFilter
+from ..core.incremental_parser import (
+    IncrementalJsonParser, TrieNode, ValueEvent, compile_field_spec, match_field_spec
+)
+
+try:
+    import orjson
+    # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，原有的异常处理保持不变
+    _json_loads = orjson.loads
+except ImportError:  # orjson为可选加速依赖
+    _json_loads = json.loads
+
+# ```json 代码块
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)```', re.IGNORECASE)
+
+# 字段过滤时读取响应与解析之间的缓冲队列长度
+_STREAM_QUEUE_SIZE = 32
+# 响应读取结束标记
+_STREAM_END = object()
 
 
 class DoubaoAdapter(BaseModelAdapter):
     """豆包适配器"""
     
-    def __init__(self, config):
+    # 豆包模型的默认限制
+    _MAX_TOKENS = {
+        "doubao-lite-4k": 4096,
+        "doubao-lite-32k": 32768,
+        "doubao-lite-128k": 128000,
+        "doubao-pro-4k": 4096,
+        "doubao-pro-32k": 32768,
+        "doubao-pro-128k": 128000
+    }
+    
+    _CONTEXT_WINDOWS = {
+        "doubao-lite-4k": 4096,
+        "doubao-lite-32k": 32768,
+        "doubao-lite-128k": 128000,
+        "doubao-pro-4k": 4096,
+        "doubao-pro-32k": 32768,
+        "doubao-pro-128k": 128000
+    }
+    
+    def __init__(self, config, response_cache_size: int = 0):
         """初始化豆包适配器
         
         Args:
             config: 模型配置
+            response_cache_size: 非流式响应缓存的最大条目数，0表示不缓存
         """
         # 设置默认base_url
         if not config.base_url:
@@ -32,6 +73,20 @@ class DoubaoAdapter(BaseModelAdapter):
         self.model_name = config.model_name
         self.api_key = config.api_key
         self.base_url = config.base_url
+        
+        # 配置在初始化后不再变化，认证头和载荷公共部分只构建一次
+        self._auth_headers = {
+            "Authorization": f"Bearer {config.api_key}",
+            "Content-Type": "application/json"
+        }
+        self._payload_base = {
+            "model": config.model_name,
+            **config.request_params
+        }
+        
+        # 非流式响应缓存，按请求内容的哈希索引，超出容量时淘汰最久未使用的条目
+        self.response_cache_size = response_cache_size
+        self._response_cache: "OrderedDict[str, ModelResponse]" = OrderedDict()
     
     def chat_completion(
         self,
@@ -53,40 +108,72 @@ class DoubaoAdapter(BaseModelAdapter):
             **kwargs: 其他参数
             
         Returns:
-            Union[Awaitable[ModelResponse], AsyncGenerator[str, None]]: 响应或流式生成器
+            Union[Awaitable[ModelResponse], AsyncGenerator[str, None]]: 响应或流式生成器；
+            流式生成器提前停止迭代时应调用其aclose()，以便立即停止读取响应
         """
 
         
+        # 其他参数以字典形式向下传递，不再逐层展开为关键字参数
         if stream:
             # 对于流式调用，直接返回async generator
             return self._stream_chat_completion(
-                messages, 
-                include_fields=include_fields,
-                exclude_fields=exclude_fields,
-                field_filter=field_filter,
-                **kwargs
+                messages, include_fields, exclude_fields, field_filter, kwargs
             )
         else:
             # 对于非流式调用，返回awaitable
-            return self._non_stream_chat_completion(messages, **kwargs)
+            return self._non_stream_chat_completion(messages, kwargs)
     
     async def _non_stream_chat_completion(
         self,
         messages: List[Dict[str, str]],
-        **kwargs
+        options: Optional[Dict[str, Any]] = None
     ) -> ModelResponse:
         """非流式聊天补全
         
         Args:
             messages: 消息列表
-            **kwargs: 其他参数
+            options: 其他请求参数
             
         Returns:
             ModelResponse: 响应
         """
-        payload = self._build_request_payload(messages, stream=False, **kwargs)
+        payload = self._build_request_payload(messages, **(options or {}))
+        
+        cache_size = self.response_cache_size
+        cache_key = self._response_cache_key(payload) if cache_size > 0 else None
+        if cache_key is None:
+            response_data = await self._make_request("/chat/completions", payload, stream=False)
+            return self._parse_response(response_data)
+        
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._response_cache.move_to_end(cache_key)
+            # 返回副本，调用方修改响应不会影响缓存
+            return copy.deepcopy(cached)
+        
         response_data = await self._make_request("/chat/completions", payload, stream=False)
-        return self._parse_response(response_data)
+        response = self._parse_response(response_data)
+        
+        self._response_cache[cache_key] = copy.deepcopy(response)
+        if len(self._response_cache) > cache_size:
+            self._response_cache.popitem(last=False)
+        return response
+    
+    @staticmethod
+    def _response_cache_key(payload: Dict[str, Any]) -> Optional[str]:
+        """计算请求载荷的缓存键
+        
+        Args:
+            payload: 请求载荷
+            
+        Returns:
+            Optional[str]: 规范化JSON的MD5；载荷含有无法序列化为JSON的值时为None，不缓存
+        """
+        try:
+            canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.md5(canonical.encode('utf-8')).hexdigest()
     
     async def _stream_chat_completion(
         self,
@@ -94,7 +181,7 @@ class DoubaoAdapter(BaseModelAdapter):
         include_fields: Optional[List[str]] = None,
         exclude_fields: Optional[List[str]] = None,
         field_filter: Optional[FieldFilter] = None,
-        **kwargs
+        options: Optional[Dict[str, Any]] = None
     ) -> AsyncGenerator[str, None]:
         """流式聊天补全 - 支持字段过滤的智能输出
         
@@ -103,15 +190,14 @@ class DoubaoAdapter(BaseModelAdapter):
             include_fields: 包含的字段列表
             exclude_fields: 排除的字段列表
             field_filter: 自定义字段过滤器
-            **kwargs: 其他参数
+            options: 其他请求参数
             
         Yields:
             str: 流式响应内容
         """
 
         
-        payload = self._build_request_payload(messages, **kwargs)
-        payload["stream"] = True
+        payload = self._build_request_payload(messages, stream=True, **(options or {}))
         headers = self._get_auth_headers()
         
         # 检查是否需要字段过滤
@@ -125,10 +211,14 @@ class DoubaoAdapter(BaseModelAdapter):
         
         if needs_field_filtering:
             # 使用字段过滤的流式解析
-            async for content in self._stream_with_field_filtering(
+            contents = self._stream_with_field_filtering(
                 payload, headers, include_fields, exclude_fields, field_filter
-            ):
-                yield content
+            )
+            try:
+                async for content in contents:
+                    yield content
+            finally:
+                await contents.aclose()
         else:
             # 原始的纯文本流式输出
             async for line in self._stream_request("/chat/completions", payload, headers):
@@ -157,283 +247,234 @@ class DoubaoAdapter(BaseModelAdapter):
             str: 过滤后的字段内容
         """
         try:
-            # 构建字段过滤器
+            # 没有启用任何过滤条件时直接流式输出，不创建解析器
             if field_filter is None:
-                if include_fields or exclude_fields:
-                    field_filter = FieldFilter(
-                        enabled=True,
-                        include_paths=include_fields or [],
-                        exclude_paths=exclude_fields or [],
-                        mode="include" if include_fields else "exclude",
-                        exact_match=False
-                    )
-                else:
-                    field_filter = FieldFilter(enabled=False)
+                filtering = bool(include_fields or exclude_fields)
+            else:
+                filtering = field_filter.enabled
             
-            # 如果没有启用字段过滤，直接流式输出
-            if not field_filter.enabled:
+            if not filtering:
                 async for line in self._stream_request("/chat/completions", payload, headers):
                     content = self._parse_stream_chunk(line)
                     if content:
                         yield content
                 return
             
-            # 真正的流式字段过滤实现
-            from ..core.streaming_parser import StreamingParser
-            import asyncio
+            # 真正的流式字段过滤实现：增量解析，字段值完成即输出
+            parser = IncrementalJsonParser()
             
-            # 创建流式解析器
-            parser = StreamingParser(field_filter=field_filter)
+            # 字段路径在流开始时编译一次，之后每个值只做前缀树查找
+            fields = include_fields or exclude_fields
+            field_spec = compile_field_spec(tuple(fields)) if fields else None
+            include_mode = bool(include_fields)
             
-            # 累积缓冲区，用于处理不完整的JSON片段
-            buffer = ""
-            json_started = False
-            json_content = ""
-            brace_count = 0
-            in_string = False
-            escape_next = False
+            # 已送入解析器的原始片段，仅在JSON非法时用于文本降级提取
+            json_parts: List[str] = []
+            emitted = 0
             
-            async for line in self._stream_request("/chat/completions", payload, headers):
-                content = self._parse_stream_chunk(line)
-                if not content:
-                    continue
-                
-                buffer += content
-                
-                # 检测JSON代码块的开始
-                if not json_started and '```' in buffer:
-                    # 查找JSON代码块开始
-                    json_start_patterns = ['```json', '```']
-                    for pattern in json_start_patterns:
-                        if pattern in buffer:
-                            start_idx = buffer.find(pattern)
-                            if start_idx != -1:
-                                json_started = True
-                                # 移除代码块标记之前的内容
-                                buffer = buffer[start_idx + len(pattern):].lstrip()
-                                break
-                
-                if json_started:
-                    # 逐字符处理，检测完整的JSON对象
-                    for char in buffer:
-                        if char == '`' and json_content.count('`') >= 2:
-                            # JSON代码块结束
-                            break
-                        
-                        json_content += char
-                        
-                        if not escape_next:
-                            if char == '"' and not escape_next:
-                                in_string = not in_string
-                            elif not in_string:
-                                if char == '{':
-                                    brace_count += 1
-                                elif char == '}':
-                                    brace_count -= 1
-                                    
-                                    # 检查是否有完整的JSON对象
-                                    if brace_count == 0 and json_content.strip():
-                                        try:
-                                            # 尝试解析JSON
-                                            data = json.loads(json_content.strip())
-                                            
-                                            # 提取字段值并流式输出
-                                            field_values = self._extract_field_values(data, include_fields, exclude_fields)
-                                            
-                                            for i, value in enumerate(field_values):
-                                                if i > 0:
-                                                    yield "\n"  # 字段间换行
-                                                
-                                                value_str = str(value)
-                                                # 真正的流式输出每个字符
-                                                for char in value_str:
-                                                    yield char
-                                                    await asyncio.sleep(0.005)  # 减少延迟
-                                            
-                                            return  # 完成输出后退出
-                                            
-                                        except json.JSONDecodeError:
-                                            # JSON不完整，继续累积
-                                            pass
-                            
-                            if char == '\\':
-                                escape_next = True
-                        else:
-                            escape_next = False
-                    
-                    buffer = ""  # 清空缓冲区
+            # 正在增量输出的字符串值的路径及已输出的字符数
+            partial_path = None
+            partial_sent = 0
             
-            # 如果没有找到完整的JSON，尝试从累积的内容中提取
-            if json_content:
-                try:
-                    data = json.loads(json_content.strip())
-                    field_values = self._extract_field_values(data, include_fields, exclude_fields)
+            event_batches = self._iter_json_events(payload, headers, parser, json_parts)
+            try:
+                async for events in event_batches:
+                    for segments, value in events:
+                        if segments == partial_path:
+                            # 字符串结束，输出剩余部分
+                            rest = value[partial_sent:]
+                            partial_path = None
+                            if rest:
+                                yield rest
+                            continue
+                        if not self._is_field_selected(segments, field_spec, include_mode):
+                            continue
+                        if emitted:
+                            yield "\n"  # 字段间换行
+                        emitted += 1
+                        # 字符串值直接输出，其余标量转换为文本
+                        yield value if value.__class__ is str else str(value)
                     
-                    for i, value in enumerate(field_values):
-                        if i > 0:
-                            yield "\n"
-                        
-                        value_str = str(value)
-                        for char in value_str:
-                            yield char
-                            await asyncio.sleep(0.005)
-                            
-                except json.JSONDecodeError:
-                    # 最后尝试从文本中提取字段
-                    field_values = self._extract_fields_from_text(json_content, include_fields, exclude_fields)
-                    for i, value in enumerate(field_values):
-                        if i > 0:
-                            yield "\n"
-                        for char in str(value):
-                            yield char
-                            await asyncio.sleep(0.005)
+                    # 长字符串不必等到结束引号，已收到的部分先输出
+                    partial = parser.partial_string()
+                    if partial is None:
+                        continue
+                    segments, text = partial
+                    if segments != partial_path:
+                        if not text or not self._is_field_selected(segments, field_spec, include_mode):
+                            continue
+                        if emitted:
+                            yield "\n"  # 字段间换行
+                        emitted += 1
+                        partial_path = segments
+                        partial_sent = 0
+                    if len(text) > partial_sent:
+                        yield text[partial_sent:]
+                        partial_sent = len(text)
+            finally:
+                await event_batches.aclose()
+            
+            # JSON不合法时，尝试从累积的内容中提取字段
+            if json_parts and not parser.done and not emitted:
+                json_content = "".join(json_parts).split('```', 1)[0]
+                field_values = self._extract_fields_from_text(json_content, include_fields, exclude_fields)
+                for i, value in enumerate(field_values):
+                    if i > 0:
+                        yield "\n"
+                    yield str(value)
                     
         except Exception as e:
             # 处理失败时的降级方案
             yield f"Error in field filtering: {str(e)}"
     
-
-    
-    def _build_field_path(self, json_data: str, field_name: str) -> str:
-        """根据JSON数据和字段名构建字段路径
+    async def _iter_stream_contents(
+        self,
+        payload: Dict[str, Any],
+        headers: Dict[str, str]
+    ) -> AsyncGenerator[str, None]:
+        """在后台任务中读取流式响应，经有界队列交给解析端
+        
+        读取和解析互不等待；解析端每次取出队列中已到达的全部内容，
+        合并后一次返回。读取任务在生成器关闭时取消，提前停止迭代的调用方
+        应调用aclose()，否则读取会持续到生成器被回收。
         
         Args:
-            json_data: JSON数据字符串
-            field_name: 字段名
+            payload: 请求载荷
+            headers: 请求头
             
-        Returns:
-            str: 字段路径
+        Yields:
+            str: 合并后的内容增量
         """
-        # 简单实现：检查是否在数组中
-        import re
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
         
-        # 查找数组索引模式
-        array_pattern = r'\[\s*(\d+)\s*\]'
-        array_matches = re.findall(array_pattern, json_data)
+        async def produce():
+            try:
+                async for line in self._stream_request("/chat/completions", payload, headers):
+                    content = self._parse_stream_chunk(line)
+                    if content:
+                        await queue.put(content)
+            except Exception as e:
+                # 异常交给解析端抛出
+                await queue.put(e)
+            else:
+                await queue.put(_STREAM_END)
         
-        if array_matches:
-            # 在数组中，构建带索引的路径
-            last_index = array_matches[-1]
-            return f"languages[{last_index}].{field_name}"
-        else:
-            # 不在数组中，直接返回字段名
-            return field_name
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                parts = [await queue.get()]
+                while not queue.empty():
+                    parts.append(queue.get_nowait())
+                
+                end = None
+                if not isinstance(parts[-1], str):
+                    end = parts.pop()
+                if parts:
+                    yield "".join(parts)
+                if isinstance(end, Exception):
+                    raise end
+                if end is not None:
+                    return
+        finally:
+            # 解析端提前结束时停止读取，并等待读取任务退出
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
     
-    def _flatten_json_paths(self, data: Any, prefix: str = "") -> Dict[str, Any]:
-        """将JSON数据扁平化为路径-值对
+    async def _iter_json_events(
+        self,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        parser: IncrementalJsonParser,
+        json_parts: List[str]
+    ) -> AsyncGenerator[List[ValueEvent], None]:
+        """读取流式响应，定位其中的JSON并增量解析
         
         Args:
-            data: JSON数据
-            prefix: 路径前缀
+            payload: 请求载荷
+            headers: 请求头
+            parser: 增量JSON解析器，JSON是否完整可通过其done属性判断
+            json_parts: 收集送入解析器的原始片段
             
-        Returns:
-            Dict[str, Any]: 路径到值的映射
+        Yields:
+            List[ValueEvent]: 每个数据块中完成解析的标量值（可能为空）
         """
-        result = {}
-        
-        if isinstance(data, dict):
-            for key, value in data.items():
-                new_prefix = f"{prefix}.{key}" if prefix else key
-                if isinstance(value, (dict, list)):
-                    result.update(self._flatten_json_paths(value, new_prefix))
-                else:
-                    result[new_prefix] = value
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                new_prefix = f"{prefix}[{i}]"
-                if isinstance(item, (dict, list)):
-                    result.update(self._flatten_json_paths(item, new_prefix))
-                else:
-                    result[new_prefix] = item
-        else:
-            result[prefix] = data
-        
-        return result
-    
-
+        json_started = False
+        # 目前收到的内容是否只有空白，只有这时才可能是未用代码块包裹的JSON
+        leading_blank = True
+        # 代码块标记之前的文本不需要保留，只保留末尾两个字符以覆盖跨块的标记
+        tail = ""
+        # 代码块标记之后、语言标识确认之前收到的内容，找到标记前为None
+        after_fence = None
+        
+        contents = self._iter_stream_contents(payload, headers)
+        try:
+            async for content in contents:
+                if not json_started:
+                    if leading_blank and not content.isspace():
+                        leading_blank = False
+                        stripped = content.lstrip()
+                        if stripped[0] in "{[":
+                            # 未使用代码块包裹的JSON
+                            json_started = True
+                            content = stripped
+                    
+                    if not json_started:
+                        if after_fence is None:
+                            text = tail + content
+                            fence_idx = text.find('```')
+                            if fence_idx < 0:
+                                tail = text[-2:]
+                                continue
+                            after_fence = text[fence_idx + 3:]
+                        else:
+                            after_fence += content
+                        content = after_fence
+                        if len(content) < 4 and "json".startswith(content.lower()):
+                            # 代码块标记后的语言标识可能还未完整到达
+                            continue
+                        if content[:4].lower() == "json":
+                            content = content[4:]
+                        content = content.lstrip()
+                        json_started = True
+                
+                json_parts.append(content)
+                try:
+                    events = parser.feed(content)
+                except ValueError:
+                    return
+                
+                yield events
+                if parser.done:
+                    return
+        finally:
+            await contents.aclose()
     
-    def _reconstruct_json_from_paths(self, path_data: Dict[str, Any]) -> Any:
-        """根据路径和值重构JSON结构
+    def _is_field_selected(
+        self,
+        segments: Tuple[Union[str, int], ...],
+        field_spec: Optional[TrieNode],
+        include_mode: bool
+    ) -> bool:
+        """判断增量解析出的标量值是否应当输出
         
         Args:
-            path_data: 路径到值的映射，如 {'languages[0].name': 'Python', 'languages[0].description': '...'}
+            segments: 值的路径段
+            field_spec: 编译后的字段路径前缀树，为None时输出全部字段
+            include_mode: True为包含模式，False为排除模式
             
         Returns:
-            Any: 重构的JSON数据
+            bool: 是否输出该值
         """
-        result = {}
+        if not segments or not isinstance(segments[-1], str):
+            # 只输出对象字段，数组中的标量元素不单独输出
+            return False
         
-        for path, value in path_data.items():
-            # 解析路径，如 "languages[0].name" -> ["languages", 0, "name"]
-            parts = []
-            current = ""
-            i = 0
-            
-            while i < len(path):
-                char = path[i]
-                if char == '[':
-                    if current:
-                        parts.append(current)
-                        current = ""
-                    # 查找匹配的]
-                    j = i + 1
-                    while j < len(path) and path[j] != ']':
-                        j += 1
-                    if j < len(path):
-                        index_str = path[i+1:j]
-                        try:
-                            parts.append(int(index_str))
-                        except ValueError:
-                            parts.append(index_str)
-                        i = j + 1
-                    else:
-                        i += 1
-                elif char == '.':
-                    if current:
-                        parts.append(current)
-                        current = ""
-                    i += 1
-                else:
-                    current += char
-                    i += 1
-            
-            if current:
-                parts.append(current)
-            
-            # 根据路径构建嵌套结构
-            current_obj = result
-            for i, part in enumerate(parts[:-1]):
-                if isinstance(part, int):
-                    # 数组索引
-                    if not isinstance(current_obj, list):
-                        current_obj = []
-                    while len(current_obj) <= part:
-                        current_obj.append({})
-                    if not isinstance(current_obj[part], (dict, list)):
-                        current_obj[part] = {}
-                    current_obj = current_obj[part]
-                else:
-                    # 对象键
-                    if part not in current_obj:
-                        # 检查下一个部分是否为数组索引
-                        if i + 1 < len(parts) - 1 and isinstance(parts[i + 1], int):
-                            current_obj[part] = []
-                        else:
-                            current_obj[part] = {}
-                    current_obj = current_obj[part]
-            
-            # 设置最终值
-            final_part = parts[-1]
-            if isinstance(final_part, int):
-                if not isinstance(current_obj, list):
-                    current_obj = []
-                while len(current_obj) <= final_part:
-                    current_obj.append(None)
-                current_obj[final_part] = value
-            else:
-                current_obj[final_part] = value
+        if field_spec is None:
+            return True
         
-        return result
+        return match_field_spec(field_spec, segments) == include_mode
+    
     
 
     
@@ -446,23 +487,19 @@ class DoubaoAdapter(BaseModelAdapter):
         Returns:
             Optional[str]: 提取的JSON字符串，如果没有找到则返回None
         """
-        import re
-        
-        # 尝试匹配```json代码块
-        json_pattern = r'```(?:json)?\s*([\s\S]*?)```'
-        matches = re.findall(json_pattern, text, re.IGNORECASE)
-        
-        for match in matches:
+        # 尝试匹配```json代码块，返回第一个有效的JSON
+        for match in _JSON_BLOCK_RE.finditer(text):
+            candidate = match.group(1).strip()
             try:
                 # 验证是否为有效JSON
-                json.loads(match.strip())
-                return match.strip()
+                _json_loads(candidate)
+                return candidate
             except json.JSONDecodeError:
                 continue
         
         # 如果没有找到代码块，尝试直接解析整个文本
         try:
-            json.loads(text.strip())
+            _json_loads(text.strip())
             return text.strip()
         except json.JSONDecodeError:
             pass
@@ -482,44 +519,45 @@ class DoubaoAdapter(BaseModelAdapter):
         """
         field_values = []
         
-        def extract_recursive(obj, path=""):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    
-                    # 检查字段是否匹配
-                    should_include = False
-                    
-                    if include_fields:
-                        # 包含模式：检查字段名是否在包含列表中
-                        for include_field in include_fields:
-                            if key == include_field or current_path.endswith(f".{include_field}"):
-                                should_include = True
-                                break
-                    elif exclude_fields:
-                        # 排除模式：检查字段名是否不在排除列表中
-                        should_include = True
-                        for exclude_field in exclude_fields:
-                            if key == exclude_field or current_path.endswith(f".{exclude_field}"):
-                                should_include = False
-                                break
-                    else:
-                        should_include = True
-                    
-                    # 如果字段匹配，添加到结果中
-                    if should_include and not isinstance(value, (dict, list)):
-                        field_values.append(value)
-                    
-                    # 递归处理嵌套结构
-                    if isinstance(value, (dict, list)):
-                        extract_recursive(value, current_path)
-                        
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    current_path = f"{path}[{i}]" if path else f"[{i}]"
-                    extract_recursive(item, current_path)
-        
-        extract_recursive(data)
+        # 与流式过滤使用同一套字段路径前缀树，字段数量不影响每个值的匹配开销
+        fields = include_fields or exclude_fields
+        
+        if not fields:
+            # 没有过滤条件时不构造路径，栈元素为 (值, 是否为对象字段)
+            stack = [(data, False)]
+            while stack:
+                value, is_field = stack.pop()
+                if isinstance(value, dict):
+                    stack.extend((child, True) for child in reversed(list(value.values())))
+                elif isinstance(value, list):
+                    stack.extend((item, False) for item in reversed(value))
+                elif is_field:
+                    field_values.append(value)
+            return field_values
+        
+        field_spec = compile_field_spec(tuple(fields))
+        include_mode = bool(include_fields)
+        
+        # 显式栈代替递归，栈元素为 (值, 路径段)；
+        # 子节点逆序入栈，保持与递归相同的先序顺序
+        stack = [(data, ())]
+        
+        while stack:
+            value, segments = stack.pop()
+            
+            if isinstance(value, dict):
+                stack.extend(
+                    (child, segments + (key,))
+                    for key, child in reversed(list(value.items()))
+                )
+            elif isinstance(value, list):
+                stack.extend(
+                    (value[i], segments + (i,))
+                    for i in range(len(value) - 1, -1, -1)
+                )
+            elif self._is_field_selected(segments, field_spec, include_mode):
+                field_values.append(value)
+        
         return field_values
     
     def _extract_fields_from_text(self, text: str, include_fields: Optional[List[str]], exclude_fields: Optional[List[str]]) -> List[str]:
@@ -536,30 +574,18 @@ class DoubaoAdapter(BaseModelAdapter):
         if not include_fields and not exclude_fields:
             return [text]
         
-        # 简单的关键词匹配实现
-        lines = text.split('\n')
+        # 简单的关键词匹配实现，包含模式优先；字段名只转换一次小写
+        include_mode = bool(include_fields)
+        lowered_fields = tuple(field.lower() for field in (include_fields or exclude_fields))
         matched_lines = []
         
-        for line in lines:
+        for line in text.split('\n'):
             line = line.strip()
             if not line:
                 continue
             
-            should_include = False
-            
-            if include_fields:
-                for field in include_fields:
-                    if field.lower() in line.lower():
-                        should_include = True
-                        break
-            elif exclude_fields:
-                should_include = True
-                for field in exclude_fields:
-                    if field.lower() in line.lower():
-                        should_include = False
-                        break
-            
-            if should_include:
+            line_lower = line.lower()
+            if any(field in line_lower for field in lowered_fields) == include_mode:
                 matched_lines.append(line)
         
         return matched_lines if matched_lines else [text]
@@ -568,32 +594,6 @@ class DoubaoAdapter(BaseModelAdapter):
     
 
     
-    def _is_json_content(self, content: str) -> bool:
-        """判断内容是否为JSON格式
-        
-        Args:
-            content: 待判断的内容
-            
-        Returns:
-            bool: 是否为JSON格式
-        """
-        content = content.strip()
-        if not content:
-            return False
-        
-        # 简单的JSON格式检测
-        try:
-            # 尝试解析为JSON
-            json.loads(content)
-            return True
-        except json.JSONDecodeError:
-            # 检查是否包含JSON结构特征
-            return (
-                (content.startswith('{') and content.endswith('}')) or
-                (content.startswith('[') and content.endswith(']')) or
-                '"' in content and (':' in content or ',' in content)
-            )
-    
     def _build_request_payload(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """构建豆包请求载荷
         
@@ -604,19 +604,16 @@ class DoubaoAdapter(BaseModelAdapter):
         Returns:
             Dict[str, Any]: 请求载荷
         """
-        payload = {
-            "model": self.config.model_name,
-            "messages": messages,
-            **self.config.request_params
-        }
+        # 模型名和配置中的请求参数已预先合并到基础载荷，这里只复制一次
+        stream = kwargs.pop("stream", False)
+        payload = dict(self._payload_base)
+        payload["messages"] = messages
         
-        # 添加额外参数
-        for key, value in kwargs.items():
-            if key not in ["stream"]:
-                payload[key] = value
+        # 没有额外参数时跳过合并
+        if kwargs:
+            payload.update(kwargs)
         
-        # 处理流式参数
-        if kwargs.get("stream", False):
+        if stream:
             payload["stream"] = True
         
         return payload
@@ -664,7 +661,7 @@ class DoubaoAdapter(BaseModelAdapter):
                 return None
             
             try:
-                data = json.loads(data_content)
+                data = _json_loads(data_content)
                 
                 if "choices" in data and len(data["choices"]) > 0:
                     choice = data["choices"][0]
@@ -684,12 +681,9 @@ class DoubaoAdapter(BaseModelAdapter):
         """获取豆包认证头
         
         Returns:
-            Dict[str, str]: 认证头
+            Dict[str, str]: 认证头（各请求共享，调用方不应修改）
         """
-        return {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json"
-        }
+        return self._auth_headers
     
     def get_model_info(self) -> Dict[str, Any]:
         """获取模型信息
@@ -715,17 +709,7 @@ class DoubaoAdapter(BaseModelAdapter):
         Returns:
             int: 最大token数
         """
-        # 豆包模型的默认限制
-        model_limits = {
-            "doubao-lite-4k": 4096,
-            "doubao-lite-32k": 32768,
-            "doubao-lite-128k": 128000,
-            "doubao-pro-4k": 4096,
-            "doubao-pro-32k": 32768,
-            "doubao-pro-128k": 128000
-        }
-        
-        return model_limits.get(self.config.model_name, 4096)
+        return self._MAX_TOKENS.get(self.config.model_name, 4096)
     
     def _get_context_window(self) -> int:
         """获取上下文窗口大小
@@ -733,16 +717,7 @@ class DoubaoAdapter(BaseModelAdapter):
         Returns:
             int: 上下文窗口大小
         """
-        context_windows = {
-            "doubao-lite-4k": 4096,
-            "doubao-lite-32k": 32768,
-            "doubao-lite-128k": 128000,
-            "doubao-pro-4k": 4096,
-            "doubao-pro-32k": 32768,
-            "doubao-pro-128k": 128000
-        }
-        
-        return context_windows.get(self.config.model_name, 4096)
+        return self._CONTEXT_WINDOWS.get(self.config.model_name, 4096)
     
     async def validate_api_key(self) -> bool:
         """验证API密钥
@@ -766,32 +741,6 @@ class DoubaoAdapter(BaseModelAdapter):
             
         except Exception:
             return False
-    
-    def _format_messages_for_doubao(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
-        """格式化消息以适配豆包API
-        
-        Args:
-            messages: 原始消息列表
-            
-        Returns:
-            List[Dict[str, str]]: 格式化后的消息列表
-        """
-        formatted_messages = []
-        
-        for message in messages:
-            # 确保消息格式正确
-            formatted_message = {
-                "role": message.get("role", "user"),
-                "content": message.get("content", "")
-            }
-            
-            # 豆包可能需要特殊处理某些角色
-            if formatted_message["role"] not in ["system", "user", "assistant"]:
-                formatted_message["role"] = "user"
-            
-            formatted_messages.append(formatted_message)
-        
-        return formatted_messages
 
 
 # 注册适配器
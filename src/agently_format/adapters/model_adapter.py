@@ -4,16 +4,179 @@
 """
 
 import asyncio
+import importlib.util
+import weakref
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, AsyncGenerator, Union
 from dataclasses import dataclass
 import httpx
 import json
+# httpx解析代理环境变量的函数（未公开导出），与httpx客户端自身的规则保持一致
+from httpx._utils import get_environment_proxies
 
 from ..types.models import ModelConfig, ModelType, ParseRequest, ParseResponse
 from ..types.events import StreamingEvent
 
 
+# 安装了h2（httpx[http2]）时启用HTTP/2，同一主机的并发请求复用一条连接
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# 共享连接池的连接数限制
+CONNECTION_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=30)
+
+# 每个事件循环一组共享连接池，连接不能跨事件循环复用
+_shared_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopConnectionPools]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _create_pool(proxy: Optional[str] = None) -> httpx.AsyncHTTPTransport:
+    """创建连接池传输层
+
+    Args:
+        proxy: 代理地址，None表示直连
+
+    Returns:
+        httpx.AsyncHTTPTransport: 连接池传输层
+    """
+    return httpx.AsyncHTTPTransport(
+        http2=HTTP2_ENABLED,
+        limits=CONNECTION_LIMITS,
+        proxy=httpx.Proxy(proxy) if proxy else None
+    )
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """共享传输层包装
+
+    将请求转发给共享连接池；关闭单个客户端时不关闭共享连接池。
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _LoopConnectionPools:
+    """一个事件循环中共享的直连连接池和按代理地址划分的代理连接池
+
+    事件循环关闭时（asyncio.run等在关闭前调用shutdown_asyncgens）关闭全部连接池。
+    """
+
+    def __init__(self):
+        self.direct = _create_pool()
+        self.proxies: Dict[str, httpx.AsyncHTTPTransport] = {}
+        # 事件循环关闭前会关闭所有未结束的异步生成器，借此在循环内关闭连接池
+        self._closer = self._close_on_shutdown()
+        try:
+            self._closer.__anext__().send(None)
+        except StopIteration:
+            pass
+
+    def proxy(self, url: str) -> httpx.AsyncHTTPTransport:
+        """获取指定代理地址的连接池
+
+        Args:
+            url: 代理地址
+
+        Returns:
+            httpx.AsyncHTTPTransport: 代理连接池
+        """
+        pool = self.proxies.get(url)
+        if pool is None:
+            pool = self.proxies[url] = _create_pool(url)
+        return pool
+
+    async def _close_on_shutdown(self):
+        try:
+            yield
+        finally:
+            # 生成器的finalizer引用着事件循环，关闭后移出全局表，事件循环才能被回收
+            _shared_pools.pop(asyncio.get_running_loop(), None)
+            await self.direct.aclose()
+            for pool in self.proxies.values():
+                await pool.aclose()
+
+
+def get_shared_transport() -> httpx.AsyncBaseTransport:
+    """获取适配器共享的HTTP传输层
+
+    同一事件循环中的所有适配器共享一个连接池，避免每个适配器各自建立TCP/TLS连接。
+    不在事件循环中调用时返回独立的传输层。
+
+    Returns:
+        httpx.AsyncBaseTransport: HTTP传输层
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _create_pool()
+
+    return _SharedTransport(_get_loop_pools(loop).direct)
+
+
+def get_shared_mounts() -> Dict[str, Optional[httpx.AsyncBaseTransport]]:
+    """按环境变量中的代理设置获取共享传输层的路由
+
+    传入transport时httpx不再读取HTTP_PROXY、HTTPS_PROXY、ALL_PROXY和NO_PROXY，
+    这里按httpx相同的规则解析这些变量，代理请求同样经过共享的代理连接池。
+    值为None的路由（NO_PROXY中的主机）使用客户端的默认传输层直连。
+
+    Returns:
+        Dict[str, Optional[httpx.AsyncBaseTransport]]: URL模式到传输层的映射，未配置代理时为空
+    """
+    proxy_map = get_environment_proxies()
+    if not proxy_map:
+        return {}
+
+    try:
+        pools = _get_loop_pools(asyncio.get_running_loop())
+    except RuntimeError:
+        return {
+            pattern: _create_pool(url) if url else None
+            for pattern, url in proxy_map.items()
+        }
+
+    return {
+        pattern: _SharedTransport(pools.proxy(url)) if url else None
+        for pattern, url in proxy_map.items()
+    }
+
+
+def _get_loop_pools(loop: asyncio.AbstractEventLoop) -> _LoopConnectionPools:
+    """获取事件循环的共享连接池，首次调用时创建"""
+    pools = _shared_pools.get(loop)
+    if pools is None:
+        # 未经shutdown_asyncgens直接关闭的事件循环不会关闭连接池，在这里移出
+        for closed_loop in [other for other in _shared_pools if other.is_closed()]:
+            del _shared_pools[closed_loop]
+        pools = _shared_pools[loop] = _LoopConnectionPools()
+    return pools
+
+
+def use_uvloop() -> bool:
+    """安装了uvloop时将其设为asyncio事件循环策略
+
+    流式输出的每个数据块都要经过多次事件循环调度，uvloop可明显降低这部分开销。
+    需在创建事件循环（如asyncio.run）之前调用；uvloop不支持Windows。
+
+    Returns:
+        bool: 是否启用了uvloop
+    """
+    try:
+        import uvloop
+    except ImportError:  # uvloop为可选加速依赖
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
 @dataclass
 class ModelResponse:
     """模型响应数据"""
@@ -50,8 +213,16 @@ class BaseModelAdapter(ABC):
             self.client = httpx.AsyncClient(
                 base_url=self.config.base_url,
                 headers=headers,
-                timeout=self.config.timeout
+                timeout=self.config.timeout,
+                transport=get_shared_transport(),
+                mounts=get_shared_mounts()
             )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """HTTP客户端（首次访问时初始化）"""
+        self._setup_client()
+        return self.client
     
     @abstractmethod
     async def chat_completion(
@@ -165,13 +336,14 @@ class BaseModelAdapter(ABC):
             response.raise_for_status()
             
             # 使用aiter_bytes()来处理原始字节流，避免aiter_lines()错误分割SSE数据
+            # 缓冲区只保存最后一个不完整的行
             buffer = b""
             async for chunk in response.aiter_bytes():
-                buffer += chunk
+                # 按行分割处理SSE格式，每个数据块只分割一次，避免反复复制剩余数据
+                lines = (buffer + chunk).split(b"\n")
+                buffer = lines.pop()
                 
-                # 按行分割处理SSE格式
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
+                for line_bytes in lines:
                     line = line_bytes.decode('utf-8', errors='ignore').strip()
                     
                     # 跳过空行
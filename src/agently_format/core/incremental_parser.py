@@ -0,0 +1,627 @@
+"""增量JSON解析器
+
+逐块接收JSON文本，从上次停止的位置继续扫描，在每个标量值完成时立即产出
+其路径和值。整个输入只被扫描一次，不会对累积的前缀重复调用json.loads。
+同时提供按字段路径删除子树的流式JSON结构过滤器。
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+PathSegments = Tuple[Union[str, int], ...]
+ValueEvent = Tuple[PathSegments, Any]
+
+# 字符串内部需要特殊处理的字符
+_STRING_STOP = re.compile(r'["\\]')
+# 字符串内容（不含结束引号），未闭合时停在末尾或末尾孤立的反斜杠处
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.DOTALL)
+# 数字和字面量（true/false/null）的结束位置
+_LITERAL_END = re.compile(r'[\s,\]}]')
+# 容器括号和字符串起始引号
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_WHITESPACE = frozenset(" \t\r\n")
+_SKIP_WHITESPACE = re.compile(r'[ \t\r\n]*')
+# 无需经过json.loads的字面量
+_CONSTANTS = {"true": True, "false": False, "null": None}
+# 字段路径中的对象键或数组索引
+_FIELD_SEGMENT = re.compile(r'([^.\[\]]+)|\[(\d+|\*)\]')
+# 字段路径中 [*] 通配下标的占位符
+_ANY_INDEX = object()
+
+# 扫描状态
+_VALUE = 0            # 期待一个值
+_VALUE_OR_CLOSE = 1   # 刚进入数组，期待值或 ]
+_KEY = 2              # 期待对象键
+_KEY_OR_CLOSE = 3     # 刚进入对象，期待键或 }
+_COLON = 4            # 期待 :
+_COMMA = 5            # 值结束后，期待 , 或容器结束符
+_STRING = 6           # 字符串内部
+_LITERAL = 7          # 数字或字面量内部
+_END = 8              # 顶层值已完成
+
+
+def format_path(segments: PathSegments) -> str:
+    """将路径段格式化为点号路径
+
+    Args:
+        segments: 路径段，如 ("languages", 0, "name")
+
+    Returns:
+        str: 路径字符串，如 "languages[0].name"
+    """
+    parts = []
+    for segment in segments:
+        if isinstance(segment, int):
+            parts.append(f"[{segment}]")
+        elif parts:
+            parts.append(f".{segment}")
+        else:
+            parts.append(segment)
+    return "".join(parts)
+
+
+class TrieNode:
+    """字段路径前缀树节点"""
+
+    __slots__ = ("children", "any_index", "is_leaf")
+
+    def __init__(self):
+        self.children: Dict[Union[str, int], "TrieNode"] = {}
+        # "[*]" 对应的子节点，匹配任意数组索引
+        self.any_index: Optional["TrieNode"] = None
+        self.is_leaf = False
+
+
+@lru_cache(maxsize=256)
+def compile_field_spec(fields: Tuple[str, ...]) -> TrieNode:
+    """将字段路径列表编译为前缀树
+
+    字段按路径后缀匹配（"name" 匹配任意层级的 name 字段，"languages[0].name"
+    匹配以该路径结尾的值，"languages[*].name" 匹配任意下标），因此路径段按逆序
+    插入，匹配时从值的最后一段向上查找。结果按字段元组缓存，相同的过滤条件只编译一次。
+
+    Args:
+        fields: 字段路径，如 ("name", "languages[0].description")
+
+    Returns:
+        TrieNode: 前缀树根节点
+    """
+    root = TrieNode()
+    for field in fields:
+        segments = [
+            key if not index else (_ANY_INDEX if index == "*" else int(index))
+            for key, index in _FIELD_SEGMENT.findall(field)
+        ]
+        if not segments:
+            continue
+        node = root
+        for segment in reversed(segments):
+            if segment is _ANY_INDEX:
+                if node.any_index is None:
+                    node.any_index = TrieNode()
+                node = node.any_index
+            else:
+                node = node.children.setdefault(segment, TrieNode())
+        node.is_leaf = True
+    return root
+
+
+def match_field_spec(spec: TrieNode, segments: PathSegments) -> bool:
+    """判断值的路径是否以前缀树中的某个字段路径结尾
+
+    Args:
+        spec: compile_field_spec 生成的前缀树
+        segments: 值的路径段
+
+    Returns:
+        bool: 是否匹配
+    """
+    return _match_from(spec, segments, len(segments) - 1)
+
+
+def _match_from(node: TrieNode, segments: PathSegments, position: int) -> bool:
+    """从路径段的指定位置向前匹配，遇到 [*] 节点时同时尝试通配分支"""
+    while position >= 0:
+        segment = segments[position]
+        if node.any_index is not None and isinstance(segment, int):
+            wildcard = node.any_index
+            if wildcard.is_leaf or _match_from(wildcard, segments, position - 1):
+                return True
+        node = node.children.get(segment)
+        if node is None:
+            return False
+        if node.is_leaf:
+            return True
+        position -= 1
+    return False
+
+
+class IncrementalJsonParser:
+    """增量JSON解析器
+
+    维护扫描游标和容器栈，跨数据块边界续接字符串、数字等未完成的token。
+    已消费的输入会被丢弃，缓冲区只保留当前未完成的token。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._cursor = 0
+        self._token_start = 0
+        self._string_is_key = False
+        self._state = _VALUE
+        # 每层为 [是否数组, 当前键或索引, 容器自身的路径段]
+        self._stack: List[list] = []
+
+    @property
+    def done(self) -> bool:
+        """顶层JSON值是否已解析完成"""
+        return self._state == _END
+
+    @property
+    def depth(self) -> int:
+        """当前容器嵌套深度"""
+        return len(self._stack)
+
+    def feed(self, chunk: str) -> List[ValueEvent]:
+        """输入一个数据块
+
+        Args:
+            chunk: JSON文本片段
+
+        Returns:
+            List[ValueEvent]: 本次完成的标量值，元素为 (路径段, 值)
+
+        Raises:
+            ValueError: 输入不是合法的JSON
+        """
+        if self._state == _END:
+            return []
+
+        buf = self._buffer + chunk if self._buffer else chunk
+        pos = self._cursor
+        end = len(buf)
+        stack = self._stack
+        state = self._state
+        token_start = self._token_start
+        events: List[ValueEvent] = []
+        # 热循环中使用的方法绑定为局部变量，避免重复的属性查找
+        emit = events.append
+        string_stop = _STRING_STOP.search
+        literal_end = _LITERAL_END.search
+        skip_whitespace = _SKIP_WHITESPACE.match
+
+        while pos < end:
+            if state == _STRING:
+                match = string_stop(buf, pos)
+                if match is None:
+                    pos = end
+                    break
+                pos = match.start()
+                if buf[pos] == "\\":
+                    if pos + 1 >= end:
+                        # 转义序列被数据块截断，等待下一块
+                        break
+                    pos += 2
+                    continue
+                raw = buf[token_start:pos]
+                pos += 1
+                text = json.loads(f'"{raw}"', strict=False) if "\\" in raw else raw
+                if self._string_is_key:
+                    stack[-1][1] = text
+                    state = _COLON
+                elif stack:
+                    frame = stack[-1]
+                    emit((frame[2] + (frame[1],), text))
+                    state = _COMMA
+                else:
+                    emit(((), text))
+                    state = _END
+                continue
+
+            if state == _LITERAL:
+                match = literal_end(buf, pos)
+                if match is None:
+                    pos = end
+                    break
+                pos = match.start()
+                value = self._decode_literal(buf[token_start:pos])
+                if stack:
+                    frame = stack[-1]
+                    emit((frame[2] + (frame[1],), value))
+                    state = _COMMA
+                else:
+                    emit(((), value))
+                    state = _END
+                continue
+
+            if state == _END:
+                break
+
+            char = buf[pos]
+            if char in _WHITESPACE:
+                # 缩进等连续空白一次跳过
+                pos = skip_whitespace(buf, pos).end()
+                continue
+
+            if state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' at position {pos}, got {char!r}")
+                state = _VALUE
+            elif state == _COMMA:
+                frame = stack[-1]
+                if char == ",":
+                    if frame[0]:
+                        frame[1] += 1
+                        state = _VALUE
+                    else:
+                        state = _KEY
+                elif char == ("]" if frame[0] else "}"):
+                    stack.pop()
+                    state = _COMMA if stack else _END
+                else:
+                    raise ValueError(f"Unexpected {char!r} at position {pos}")
+            elif state == _KEY or state == _KEY_OR_CLOSE:
+                if char == '"':
+                    token_start = pos + 1
+                    self._string_is_key = True
+                    state = _STRING
+                elif char == "}" and state == _KEY_OR_CLOSE:
+                    stack.pop()
+                    state = _COMMA if stack else _END
+                else:
+                    raise ValueError(f"Expected object key at position {pos}, got {char!r}")
+            else:
+                # _VALUE / _VALUE_OR_CLOSE
+                if char == '"':
+                    token_start = pos + 1
+                    self._string_is_key = False
+                    state = _STRING
+                elif char == "{" or char == "[":
+                    if stack:
+                        frame = stack[-1]
+                        segments = frame[2] + (frame[1],)
+                    else:
+                        segments = ()
+                    if char == "{":
+                        stack.append([False, None, segments])
+                        state = _KEY_OR_CLOSE
+                    else:
+                        stack.append([True, 0, segments])
+                        state = _VALUE_OR_CLOSE
+                elif char == "]" and state == _VALUE_OR_CLOSE:
+                    stack.pop()
+                    state = _COMMA if stack else _END
+                elif char in "-0123456789tfn":
+                    token_start = pos
+                    state = _LITERAL
+                else:
+                    raise ValueError(f"Unexpected {char!r} at position {pos}")
+            pos += 1
+
+        # 只保留未完成的token，已消费的输入直接丢弃
+        if state == _STRING or state == _LITERAL:
+            self._buffer = buf[token_start:]
+            self._cursor = pos - token_start
+            self._token_start = 0
+        else:
+            self._buffer = ""
+            self._cursor = 0
+            self._token_start = 0
+        self._state = state
+        return events
+
+    def close(self) -> List[ValueEvent]:
+        """结束输入，输出末尾未以分隔符结束的顶层数字或字面量
+
+        Returns:
+            List[ValueEvent]: 剩余完成的标量值
+        """
+        if self._state == _LITERAL and not self._stack:
+            value = self._decode_literal(self._buffer)
+            self._buffer = ""
+            self._cursor = 0
+            self._state = _END
+            return [((), value)]
+        return []
+
+    def partial_string(self) -> Optional[ValueEvent]:
+        """获取正在接收中的字符串值
+
+        返回的内容总是该字符串最终值的前缀，可用于在字符串结束前增量输出。
+
+        Returns:
+            Optional[ValueEvent]: (路径段, 目前已解码的内容)；当前不在字符串值内部时为None
+        """
+        if self._state != _STRING or self._string_is_key:
+            return None
+
+        raw = self._buffer[:self._cursor]
+        if "\\" in raw:
+            # 末尾的 \uXXXX 转义可能还不完整，或是代理对的高位部分，先不输出
+            while True:
+                escape = raw.rfind("\\", max(len(raw) - 6, 0))
+                if escape < 0 or raw[escape + 1:escape + 2] != "u":
+                    break
+                start = escape
+                while start and raw[start - 1] == "\\":
+                    start -= 1
+                # 前面有奇数个反斜杠时，该反斜杠本身是被转义的字符
+                if (escape - start) % 2:
+                    break
+                code = raw[escape + 2:].lower()
+                if len(code) == 4 and not "d800" <= code < "dc00":
+                    break
+                raw = raw[:escape]
+            text = json.loads(f'"{raw}"', strict=False)
+        else:
+            text = raw
+
+        if self._stack:
+            frame = self._stack[-1]
+            return frame[2] + (frame[1],), text
+        return (), text
+
+    @staticmethod
+    def _decode_literal(raw: str) -> Any:
+        """解码数字或 true/false/null 字面量"""
+        if raw in _CONSTANTS:
+            return _CONSTANTS[raw]
+        if raw.isdigit() and (raw[0] != "0" or len(raw) == 1):
+            return int(raw)
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON literal: {raw!r}") from e
+
+
+class StreamingJsonFilter:
+    """流式JSON结构过滤器
+
+    从JSON文本中删除路径匹配排除字段的成员（整棵子树），其余token按原文切片
+    直接复制到输出，不构建Python对象，也不重新序列化。输出为去除空白的紧凑JSON。
+    """
+
+    def __init__(self, exclude_spec: TrieNode):
+        """初始化过滤器
+
+        Args:
+            exclude_spec: compile_field_spec 生成的排除字段前缀树
+        """
+        self._spec = exclude_spec
+        self._pending = ""
+        # 每层为 [是否数组, 当前键或索引, 容器自身的路径段, 是否已输出成员, 是否期待键]
+        self._stack: List[list] = []
+        # 正在跳过的子树所在的容器深度
+        self._skip_depth = -1
+        # 快速跳过被排除的容器时尚未闭合的括号层数
+        self._skip_nesting = 0
+        # 未闭合字符串已扫描的长度（从 _pending 开头的引号算起）
+        self._string_scan = 0
+        # 已扫描部分是否以尚缺转义目标字符的反斜杠结尾
+        self._string_escaped = False
+        # 未闭合字符串期间到达、尚未拼接进 _pending 的数据块
+        self._string_chunks: List[str] = []
+
+    def feed(self, chunk: str) -> str:
+        """输入一个数据块
+
+        Args:
+            chunk: JSON文本片段
+
+        Returns:
+            str: 本数据块对应的过滤后文本
+
+        Raises:
+            ValueError: 输入不是合法的JSON
+        """
+        if self._string_scan:
+            # 字符串未闭合时只扫描新数据块，闭合前不拼接缓冲区
+            if not chunk:
+                return ""
+            stop = _STRING_BODY.match(chunk, 1 if self._string_escaped else 0).end()
+            if stop == len(chunk) or chunk[stop] != '"':
+                self._string_chunks.append(chunk)
+                self._string_scan += len(chunk)
+                self._string_escaped = stop < len(chunk)
+                return ""
+            buf = self._pending + "".join(self._string_chunks) + chunk
+            self._string_chunks = []
+            self._string_scan += stop
+            self._string_escaped = False
+        else:
+            buf = self._pending + chunk if self._pending else chunk
+        pos = 0
+        end = len(buf)
+        stack = self._stack
+        out: List[str] = []
+
+        while pos < end:
+            if self._skip_nesting:
+                pos = self._skip_container(buf, pos)
+                if self._skip_nesting:
+                    break
+                self._value_done()
+                continue
+
+            char = buf[pos]
+            if char in _WHITESPACE:
+                pos += 1
+                continue
+
+            if char == "," or char == ":":
+                if char == "," and stack:
+                    frame = stack[-1]
+                    if frame[0]:
+                        frame[1] += 1
+                    else:
+                        frame[4] = True
+                pos += 1
+                continue
+
+            if char == "}" or char == "]":
+                if not stack:
+                    raise ValueError(f"Unexpected {char!r} at position {pos}")
+                stack.pop()
+                if self._skip_depth < 0:
+                    out.append(char)
+                pos += 1
+                self._value_done()
+                continue
+
+            # 对象键
+            if char == '"' and stack and not stack[-1][0] and stack[-1][4]:
+                token_end = self._string_end(buf, pos)
+                if token_end < 0:
+                    break
+                raw = buf[pos:token_end]
+                frame = stack[-1]
+                frame[1] = json.loads(raw, strict=False) if "\\" in raw else raw[1:-1]
+                frame[4] = False
+                pos = token_end
+                if self._skip_depth < 0:
+                    if match_field_spec(self._spec, frame[2] + (frame[1],)):
+                        self._skip_depth = len(stack)
+                    else:
+                        if frame[3]:
+                            out.append(",")
+                        frame[3] = True
+                        out.append(raw)
+                        out.append(":")
+                continue
+
+            # 值的起始位置
+            if char == '"':
+                token_end = self._string_end(buf, pos)
+                if token_end < 0:
+                    break
+            elif char == "{" or char == "[":
+                token_end = pos + 1
+            else:
+                match = _LITERAL_END.search(buf, pos)
+                if match is None:
+                    break
+                token_end = match.start()
+
+            if self._skip_depth < 0 and stack and stack[-1][0]:
+                frame = stack[-1]
+                if match_field_spec(self._spec, frame[2] + (frame[1],)):
+                    self._skip_depth = len(stack)
+                else:
+                    if frame[3]:
+                        out.append(",")
+                    frame[3] = True
+
+            if self._skip_depth < 0:
+                out.append(buf[pos:token_end])
+            elif char == "{" or char == "[":
+                # 被排除的容器内部无需解析路径，只需找到匹配的结束括号
+                self._skip_nesting = 1
+                pos = token_end
+                continue
+
+            if char == "{" or char == "[":
+                parent = stack[-1] if stack else None
+                segments = parent[2] + (parent[1],) if parent else ()
+                stack.append([char == "[", 0 if char == "[" else None, segments, False, char == "{"])
+            else:
+                self._value_done()
+            pos = token_end
+
+        self._pending = buf[pos:]
+        return "".join(out)
+
+    def close(self) -> str:
+        """结束输入，输出末尾未以分隔符结束的顶层数字或字面量
+
+        Returns:
+            str: 剩余的过滤后文本
+        """
+        pending = (self._pending + "".join(self._string_chunks)).strip()
+        self._pending = ""
+        self._string_chunks = []
+        self._string_scan = 0
+        self._string_escaped = False
+        return pending if not self._stack else ""
+
+    def _skip_container(self, buf: str, pos: int) -> int:
+        """跳过被排除容器的剩余部分
+
+        只在结构字符和引号处停下，字符串整体跳过，括号层数归零即容器结束。
+
+        Args:
+            buf: 当前缓冲区
+            pos: 起始位置
+
+        Returns:
+            int: 继续扫描的位置；容器未结束时为缓冲区末尾或未完成字符串的起点
+        """
+        nesting = self._skip_nesting
+        structural = _STRUCTURAL.search
+        while nesting:
+            match = structural(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            pos = match.start()
+            char = buf[pos]
+            if char == '"':
+                token_end = self._string_end(buf, pos)
+                if token_end < 0:
+                    break
+                pos = token_end
+                continue
+            nesting += 1 if char == "{" or char == "[" else -1
+            pos += 1
+        self._skip_nesting = nesting
+        return pos
+
+    def _string_end(self, buf: str, pos: int) -> int:
+        """查找字符串的结束位置
+
+        字符串未闭合时记录已扫描的长度和末尾的转义状态，之后的数据块只扫描
+        新到达的部分，避免长字符串按小块到达时反复从头匹配。
+
+        Args:
+            buf: 当前缓冲区
+            pos: 字符串起始引号的位置
+
+        Returns:
+            int: 结束引号之后的位置；字符串未闭合时为 -1
+        """
+        start = pos + 1
+        if self._string_scan:
+            # 未闭合的字符串总是保留在 _pending 开头，此时已定位到结束引号
+            start = self._string_scan
+            self._string_scan = 0
+        stop = _STRING_BODY.match(buf, start).end()
+        if stop < len(buf) and buf[stop] == '"':
+            return stop + 1
+        self._string_scan = len(buf) - pos
+        self._string_escaped = stop < len(buf)
+        return -1
+
+    def _value_done(self) -> None:
+        """一个值结束时，检查是否离开了被跳过的子树"""
+        if self._skip_depth == len(self._stack):
+            self._skip_depth = -1
+
+
+def stream_filter_tokens(chunks: Iterable[str], exclude_spec: TrieNode) -> Iterator[str]:
+    """按数据块过滤JSON文本流
+
+    Args:
+        chunks: JSON文本片段
+        exclude_spec: compile_field_spec 生成的排除字段前缀树
+
+    Yields:
+        str: 每个数据块对应的过滤后文本（可能为空串）
+    """
+    json_filter = StreamingJsonFilter(exclude_spec)
+    for chunk in chunks:
+        yield json_filter.feed(chunk)
+    tail = json_filter.close()
+    if tail:
+        yield tail
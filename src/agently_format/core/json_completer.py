@@ -13,12 +13,187 @@ Phase 1 优化：
 import json
 import re
 import ast
+import sys
 from typing import Optional, List, Tuple, Dict, Any, Union
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import copy
 
+try:
+    import orjson
+    _fast_loads = orjson.loads
+except ImportError:  # orjson为可选加速依赖
+    _fast_loads = None
+
+# dataclass(slots=True)需要Python 3.10及以上
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# 字符串外需要处理的字符：引号和括号
+_STRUCTURAL_RE = re.compile(r'["{}\[\]]')
+# 行注释，从第一个 // 到行尾
+_LINE_COMMENT_RE = re.compile(r'//[^\n]*')
+# 结构字符及其两侧的空白
+_STRUCTURAL_WS_RE = re.compile(r'\s*([{}\[\],:])\s*')
+# 连续空白
+_WHITESPACE_RE = re.compile(r'\s+')
+# 将ASCII空白字符（与\s在ASCII范围内匹配的字符一致）统一转换为空格
+_ASCII_WHITESPACE_TO_SPACE = str.maketrans('\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f', ' ' * 9)
+# 连续多个空格
+_SPACE_RUN_RE = re.compile(' {2,}')
+# 对象或数组结尾前多余的逗号
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+# 缺少逗号的对象属性："key":value "key2":
+_MISSING_PROPERTY_COMMA_RE = re.compile(r'("[^"]*"\s*:\s*(?:"[^"]*"|[^,}\]]+))\s+("[^"]*"\s*:)')
+# 空白后紧跟引号，缺少逗号的对象属性必然包含该片段
+_WHITESPACE_QUOTE_RE = re.compile(r'\s"')
+# 缺少逗号的相邻值：value value
+_MISSING_VALUE_COMMA_RE = re.compile(r'((?:"[^"]*"|[^,\]\s]+))\s+((?:"[^"]*"|[^,\]\s]+))')
+# 同上，但非引号开头的值只从值的起始处匹配。同一段连续字符中，从中间开始匹配
+# 与从起始处匹配的结果相同，跳过这些位置避免长值上的二次方回溯
+_MISSING_VALUE_COMMA_START_RE = re.compile(
+    r'((?:"[^"]*"|(?<![^,\]\s])[^,\]\s]+))\s+((?:"[^"]*"|[^,\]\s]+))'
+)
+
+
+# JSON标准定义的空白字符
+_JSON_WHITESPACE = ' \t\n\r'
+# 对象和数组的首尾字符
+_CONTAINER_CLOSE = {'{': '}', '[': ']'}
+
+
+def _is_valid_json(json_str: str) -> bool:
+    """判断字符串是否已经是有效JSON
+    
+    以'{'或'['开头却不以对应括号结尾的输入（流式输出中最常见的不完整JSON）
+    不解析直接判定无效。其余输入安装了orjson时先用orjson快速校验；
+    orjson拒绝但标准库接受的输入（如NaN、超出64位的整数）再交给json.loads确认，
+    结果与json.loads一致。
+    
+    Args:
+        json_str: JSON字符串
+        
+    Returns:
+        bool: 是否为有效JSON
+    """
+    stripped = json_str.strip(_JSON_WHITESPACE)
+    if not stripped:
+        return False
+    close = _CONTAINER_CLOSE.get(stripped[0])
+    if close is not None and stripped[-1] != close:
+        return False
+    
+    if _fast_loads is not None:
+        try:
+            _fast_loads(json_str)
+            return True
+        except json.JSONDecodeError:
+            pass
+    try:
+        json.loads(json_str)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+# 位压缩的括号栈：最高位的1为哨兵，其下每一位表示一层未闭合的括号，
+# 0为'{'、1为'['，最低位为栈顶。只有哨兵时栈为空
+_EMPTY_BRACKET_STACK = 1
+# 以栈顶位为下标查找对应的开括号和闭括号
+_OPEN_OF = '{['
+_CLOSE_OF = '}]'
+
+
+def _unpack_bracket_stack(stack: int) -> List[str]:
+    """将位压缩的括号栈展开为开括号列表
+    
+    Args:
+        stack: 位压缩的括号栈
+        
+    Returns:
+        List[str]: 未闭合的开括号，栈底在前
+    """
+    brackets = []
+    while stack != _EMPTY_BRACKET_STACK:
+        brackets.append(_OPEN_OF[stack & 1])
+        stack >>= 1
+    brackets.reverse()
+    return brackets
+
+
+def _scan_json_structure(
+    json_str: str,
+    pos: int = 0,
+    stack: int = _EMPTY_BRACKET_STACK,
+    in_string: bool = False
+) -> Tuple[int, int, bool, List[Tuple[int, str, Optional[str]]]]:
+    """扫描JSON字符串的括号和字符串结构
+    
+    只在引号、反斜杠和括号处停下：字符串外由正则表达式在C层跳过其余字符，
+    字符串内用str.find直接定位下一个引号和转义符。
+    传入上次返回的状态即可从断点继续扫描追加的内容。
+    
+    Args:
+        json_str: JSON字符串
+        pos: 开始扫描的位置
+        stack: 位压缩的未闭合括号栈
+        in_string: 开始位置是否在字符串内
+        
+    Returns:
+        Tuple[int, int, bool, List[Tuple[int, str, Optional[str]]]]:
+            (下次继续扫描的位置, 位压缩的未闭合括号栈, 是否在字符串内,
+            不匹配的闭合括号列表 (位置, 括号, 期望的括号，栈为空时为None))
+    """
+    mismatches = []
+    length = len(json_str)
+    # 下一个引号和转义符的位置，用str.find查找（单字符查找为C层的memchr），
+    # 位置仍在当前位置之后时复用，不重复扫描；不存在时为length
+    next_quote = next_escape = -1
+    
+    while True:
+        if in_string:
+            if next_escape < pos:
+                next_escape = json_str.find('\\', pos)
+                if next_escape < 0:
+                    next_escape = length
+            if next_quote < pos:
+                next_quote = json_str.find('"', pos)
+                if next_quote < 0:
+                    next_quote = length
+            if next_escape < next_quote:
+                # 跳过被转义的字符；转义符在末尾时位置越过末尾一位，续扫时跳过下一个字符
+                pos = next_escape + 2
+            elif next_quote < length:
+                pos = next_quote + 1
+                in_string = False
+            else:
+                break
+            continue
+        
+        match = _STRUCTURAL_RE.search(json_str, pos)
+        if match is None:
+            break
+        char = match.group()
+        pos = match.end()
+        
+        if char == '"':
+            in_string = True
+        elif char == '{':
+            stack <<= 1
+        elif char == '[':
+            stack = (stack << 1) | 1
+        elif stack != _EMPTY_BRACKET_STACK:
+            expected = _CLOSE_OF[stack & 1]
+            if char == expected:
+                stack >>= 1
+            else:
+                mismatches.append((match.start(), char, expected))
+        else:
+            mismatches.append((match.start(), char, None))
+    
+    return max(pos, len(json_str)), stack, in_string, mismatches
+
 
 class CompletionStrategy(Enum):
     """补全策略枚举"""
@@ -35,6 +210,15 @@ class RepairSeverity(Enum):
     CRITICAL = "critical"  # 关键修复（可能改变语义）
 
 
+# 各修复严重程度对应的置信度
+_SEVERITY_CONFIDENCE = {
+    RepairSeverity.MINOR: 0.95,
+    RepairSeverity.MODERATE: 0.8,
+    RepairSeverity.MAJOR: 0.6,
+    RepairSeverity.CRITICAL: 0.4
+}
+
+
 class RepairPhase(Enum):
     """修复阶段"""
     LEXICAL = "lexical"    # 词法阶段
@@ -153,7 +337,7 @@ class RepairTrace:
         }
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class CompletionResult:
     """补全结果"""
     completed_json: str
@@ -201,8 +385,11 @@ class CompletionResult:
         # 1. 基于补全复杂度的基础置信度
         if self.original_length > 0:
             completion_ratio = (self.completed_length - self.original_length) / self.original_length
-            base_confidence = max(0.1, 1.0 - min(completion_ratio, 0.9))
-            confidence_factors.append(base_confidence)
+            # 等价于max(0.1, 1.0 - min(completion_ratio, 0.9))
+            if completion_ratio > 0.9:
+                completion_ratio = 0.9
+            base_confidence = 1.0 - completion_ratio
+            confidence_factors.append(0.1 if base_confidence < 0.1 else base_confidence)
         
         # 2. 基于修复追踪的置信度
         if self.repair_trace:
@@ -216,17 +403,14 @@ class CompletionResult:
             confidence_factors.append(self.repair_trace.overall_confidence)
             
             # 严重程度影响
-            severity_confidence = {
-                RepairSeverity.MINOR: 0.95,
-                RepairSeverity.MODERATE: 0.8,
-                RepairSeverity.MAJOR: 0.6,
-                RepairSeverity.CRITICAL: 0.4
-            }.get(self.repair_trace.overall_severity, 0.5)
+            severity_confidence = _SEVERITY_CONFIDENCE.get(self.repair_trace.overall_severity, 0.5)
             confidence_factors.append(severity_confidence)
         
         # 3. Schema 建议命中率
         if self.schema_suggestions_applied > 0:
-            schema_confidence = min(1.0, 0.8 + 0.2 * self.schema_suggestions_applied / 5)
+            schema_confidence = 0.8 + 0.2 * self.schema_suggestions_applied / 5
+            if schema_confidence > 1.0:
+                schema_confidence = 1.0
             confidence_factors.append(schema_confidence)
         
         # 4. 历史成功率
@@ -333,6 +517,9 @@ class JSONCompleter:
         self.recent_failures = 0
         self.last_strategy_switch = None
         self.min_switch_interval = timedelta(minutes=1)  # 最小策略切换间隔
+        
+        # 上次结构扫描的输入和结束状态，流式场景中输入是逐步增长的前缀，可从断点继续扫描
+        self._scan_checkpoint: Optional[Tuple[str, int, int, bool, List[Tuple[int, str, Optional[str]]]]] = None
     
     def complete(self, json_str: str, strategy: Optional[CompletionStrategy] = None, max_depth: Optional[int] = None) -> CompletionResult:
         """补全JSON字符串
@@ -359,8 +546,7 @@ class JSONCompleter:
         
         try:
             # 首先尝试解析原始JSON
-            try:
-                json.loads(json_str)
+            if _is_valid_json(json_str):
                 # 如果已经是有效JSON，直接返回
                 result = CompletionResult(
                     completed_json=json_str,
@@ -375,8 +561,6 @@ class JSONCompleter:
                 )
                 self._record_strategy_result(current_strategy, True, result.confidence)
                 return result
-            except json.JSONDecodeError:
-                pass
             
             # Phase 1: 词法阶段修复
             lexical_result = self._lexical_repair_phase(json_str, repair_trace)
@@ -477,21 +661,17 @@ class JSONCompleter:
         # 移除前后空白
         cleaned = json_str.strip()
         
-        # 移除可能的注释（简单处理）
-        lines = cleaned.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            # 移除行注释
-            if '//' in line:
-                line = line[:line.index('//')]
-            cleaned_lines.append(line)
-        
-        cleaned = '\n'.join(cleaned_lines)
+        # 移除可能的行注释（简单处理），没有 // 时不做替换
+        if '//' in cleaned:
+            cleaned = _LINE_COMMENT_RE.sub('', cleaned)
         
-        # 移除多余的空白字符
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        cleaned = re.sub(r'\s*([{}\[\],:])', r'\1', cleaned)
-        cleaned = re.sub(r'([{}\[\],:])\s*', r'\1', cleaned)
+        # 移除多余的空白字符：先去掉结构字符两侧的空白，再将其余连续空白合并为一个空格
+        cleaned = _STRUCTURAL_WS_RE.sub(r'\1', cleaned)
+        if cleaned.isascii():
+            # 纯ASCII文本用translate在C层转换空白，只对连续空格做替换
+            cleaned = _SPACE_RUN_RE.sub(' ', cleaned.translate(_ASCII_WHITESPACE_TO_SPACE))
+        else:
+            cleaned = _WHITESPACE_RE.sub(' ', cleaned)
         
         return cleaned.strip()
     
@@ -508,72 +688,34 @@ class JSONCompleter:
         if not json_str:
             return "{}"
         
-        # 使用栈来跟踪括号状态
-        stack = []
-        in_string = False
-        escape_next = False
-        result = []
+        # 使用栈来跟踪括号状态，结果按原文切片拼接
+        _, stack, in_string, mismatches = _scan_json_structure(json_str)
         
-        i = 0
-        while i < len(json_str):
-            char = json_str[i]
-            
-            if escape_next:
-                result.append(char)
-                escape_next = False
-                i += 1
-                continue
-            
-            if char == '\\' and in_string:
-                escape_next = True
-                result.append(char)
-                i += 1
-                continue
-            
-            if char == '"' and not escape_next:
-                in_string = not in_string
-                result.append(char)
-                i += 1
-                continue
-            
-            if in_string:
-                result.append(char)
-                i += 1
-                continue
-            
-            # 处理括号
-            if char in '{[':
-                stack.append(char)
-                result.append(char)
-            elif char in '}]':
-                if stack:
-                    expected = '}' if stack[-1] == '{' else ']'
-                    if char == expected:
-                        stack.pop()
-                    result.append(char)
-                else:
-                    # 多余的闭合括号，根据策略处理
-                    if self.strategy != CompletionStrategy.AGGRESSIVE:
-                        result.append(char)
-            else:
-                result.append(char)
-            
-            i += 1
+        # 多余的闭合括号，根据策略处理
+        dropped = []
+        if self.strategy == CompletionStrategy.AGGRESSIVE:
+            dropped = [index for index, _, expected in mismatches if expected is None]
+        
+        if dropped:
+            result = []
+            start = 0
+            for index in dropped:
+                result.append(json_str[start:index])
+                start = index + 1
+            result.append(json_str[start:])
+        else:
+            result = [json_str]
         
         # 处理未闭合的字符串
         if in_string:
             result.append('"')
             completion_details["quotes_added"] += 1
         
-        # 处理未闭合的括号
-        while stack:
-            bracket = stack.pop()
-            if bracket == '{':
-                result.append('}')
-                completion_details["brackets_added"] += 1
-            elif bracket == '[':
-                result.append(']')
-                completion_details["brackets_added"] += 1
+        # 处理未闭合的括号，从栈顶开始闭合
+        while stack != _EMPTY_BRACKET_STACK:
+            result.append(_CLOSE_OF[stack & 1])
+            completion_details["brackets_added"] += 1
+            stack >>= 1
         
         completed = ''.join(result)
         
@@ -592,20 +734,20 @@ class JSONCompleter:
         Returns:
             str: 后处理后的JSON字符串
         """
-        # 移除多余的逗号
-        # 处理对象中的尾随逗号
-        json_str = re.sub(r',\s*}', '}', json_str)
-        # 处理数组中的尾随逗号
-        json_str = re.sub(r',\s*]', ']', json_str)
-        
-        # 计算移除的逗号数量
-        original_commas = json_str.count(',')
+        # 移除对象和数组中的尾随逗号
+        json_str = _TRAILING_COMMA_RE.sub(r'\1', json_str)
         
-        # 修复缺失的逗号（简单启发式）
+        # 修复缺失的逗号（简单启发式），逗号数量只在此处会变化
         if self.strategy in [CompletionStrategy.SMART, CompletionStrategy.AGGRESSIVE]:
-            json_str = self._fix_missing_commas(json_str)
-        
-        completion_details["commas_removed"] = original_commas - json_str.count(',')
+            original_commas = json_str.count(',')
+            fixed = self._fix_missing_commas(json_str)
+            if fixed is json_str:
+                completion_details["commas_removed"] = 0
+            else:
+                completion_details["commas_removed"] = original_commas - fixed.count(',')
+                json_str = fixed
+        else:
+            completion_details["commas_removed"] = 0
         
         # 修复缺失的引号
         if self.strategy == CompletionStrategy.AGGRESSIVE:
@@ -622,23 +764,38 @@ class JSONCompleter:
         Returns:
             str: 修复后的JSON字符串
         """
+        # 两种模式都要求值之间有空白，没有空白时无需修复
+        if _WHITESPACE_RE.search(json_str) is None:
+            return json_str
+        
         # 在对象属性之间添加逗号
-        # 匹配 "key":value "key2" 模式
-        json_str = re.sub(
-            r'("[^"]*"\s*:\s*(?:"[^"]*"|[^,}\]]+))\s+("[^"]*"\s*:)',
-            r'\1,\2',
-            json_str
-        )
+        # 匹配 "key":value "key2" 模式；该模式要求空白后紧跟引号，没有时跳过
+        if _WHITESPACE_QUOTE_RE.search(json_str):
+            json_str = _MISSING_PROPERTY_COMMA_RE.sub(r'\1,\2', json_str)
         
         # 在数组元素之间添加逗号
-        # 匹配 value value 模式
-        json_str = re.sub(
-            r'((?:"[^"]*"|[^,\]\s]+))\s+((?:"[^"]*"|[^,\]\s]+))',
-            r'\1,\2',
-            json_str
-        )
-        
-        return json_str
+        # 匹配 value value 模式；上次匹配结束处可能位于一段值的中间，
+        # 先在该处尝试完整模式，之后只从值的起始处查找
+        parts = []
+        pos = 0
+        length = len(json_str)
+        while pos < length:
+            match = (
+                _MISSING_VALUE_COMMA_RE.match(json_str, pos)
+                or _MISSING_VALUE_COMMA_START_RE.search(json_str, pos + 1)
+            )
+            if match is None:
+                break
+            parts.append(json_str[pos:match.start()])
+            parts.append(match.group(1))
+            parts.append(',')
+            parts.append(match.group(2))
+            pos = match.end()
+        
+        if not parts:
+            return json_str
+        parts.append(json_str[pos:])
+        return ''.join(parts)
     
     def _fix_missing_quotes(self, json_str: str) -> str:
         """修复缺失的引号
@@ -674,43 +831,19 @@ class JSONCompleter:
             return True, reasons
         
         # 检查括号平衡
-        bracket_stack = []
-        in_string = False
-        escape_next = False
-        
-        for char in json_str:
-            if escape_next:
-                escape_next = False
-                continue
-            
-            if char == '\\' and in_string:
-                escape_next = True
-                continue
-            
-            if char == '"' and not escape_next:
-                in_string = not in_string
-                continue
-            
-            if in_string:
-                continue
-            
-            if char in '{[':
-                bracket_stack.append(char)
-            elif char in '}]':
-                if not bracket_stack:
-                    reasons.append(f"Unmatched closing bracket: {char}")
-                else:
-                    expected = '}' if bracket_stack[-1] == '{' else ']'
-                    if char == expected:
-                        bracket_stack.pop()
-                    else:
-                        reasons.append(f"Mismatched bracket: expected {expected}, got {char}")
+        bracket_stack, in_string, mismatches = self._scan_structure(json_str)
+        
+        for _, char, expected in mismatches:
+            if expected is None:
+                reasons.append(f"Unmatched closing bracket: {char}")
+            else:
+                reasons.append(f"Mismatched bracket: expected {expected}, got {char}")
         
         if in_string:
             reasons.append("Unclosed string")
         
-        if bracket_stack:
-            reasons.append(f"Unclosed brackets: {bracket_stack}")
+        if bracket_stack != _EMPTY_BRACKET_STACK:
+            reasons.append(f"Unclosed brackets: {_unpack_bracket_stack(bracket_stack)}")
         
         # 检查是否以不完整的方式结束
         stripped = json_str.strip()
@@ -721,6 +854,30 @@ class JSONCompleter:
         
         return len(reasons) > 0, reasons
     
+    def _scan_structure(self, json_str: str) -> Tuple[int, bool, List[Tuple[int, str, Optional[str]]]]:
+        """扫描JSON结构，输入是上次输入的延续时只扫描新增部分
+        
+        Args:
+            json_str: JSON字符串
+            
+        Returns:
+            Tuple[int, bool, List[Tuple[int, str, Optional[str]]]]:
+                (位压缩的未闭合括号栈, 是否在字符串内, 不匹配的闭合括号列表)
+        """
+        checkpoint = self._scan_checkpoint
+        if checkpoint is not None and json_str.startswith(checkpoint[0]):
+            _, pos, stack, in_string, mismatches = checkpoint
+            pos, stack, in_string, new_mismatches = _scan_json_structure(
+                json_str, pos, stack, in_string
+            )
+            mismatches = mismatches + new_mismatches
+        else:
+            pos, stack, in_string, mismatches = _scan_json_structure(json_str)
+        
+        self._scan_checkpoint = (json_str, pos, stack, in_string, mismatches)
+        # 括号栈是不可变的整数，只需复制不匹配列表，调用方修改结果不影响断点
+        return stack, in_string, list(mismatches)
+    
     def get_completion_stats(self) -> Dict[str, Any]:
         """获取补全统计信息
         
@@ -951,6 +1108,7 @@ def complete_json(
     Returns:
         CompletionResult: 补全结果
     """
+    # 补全器带有统计、策略历史和扫描断点等状态，每次调用单独创建，不跨调用和线程共享
     completer = JSONCompleter(strategy)
     return completer.complete(json_str)
 
@@ -3,16 +3,33 @@
 提供内存监控、清理和优化功能，确保流式解析器在长时间运行时的内存稳定性。
 """
 
+import functools
 import gc
+import heapq
+import itertools
+import os
+import sys
 import weakref
 import threading
 import time
-from typing import Dict, Any, Optional, Set, Callable
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Callable, List, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，缺失时进程内存按0处理
+    psutil = None
 
-@dataclass
+# 进程内存读数的缓存时间（秒），避免频繁读取/proc
+MEMORY_SAMPLE_TTL = 1.0
+
+# dataclass(slots=True)需要Python 3.10及以上
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class MemoryStats:
     """内存统计信息"""
     total_sessions: int = 0
@@ -24,6 +41,90 @@ class MemoryStats:
     gc_collections: int = 0
 
 
+class _ObjectWrapper:
+    """包装不支持弱引用的对象（如dict），使其可以被弱引用"""
+    
+    __slots__ = ('obj', '__weakref__')
+    
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+
+class _CleanupScheduler:
+    """进程内共享的定时清理调度器
+    
+    所有MemoryManager共用一个守护线程，按各自的清理间隔调用perform_cleanup。
+    调度器只持有管理器的弱引用，管理器被回收或停止后自动移出调度。
+    """
+    
+    def __init__(self):
+        self._queue: List[Tuple[float, int, weakref.ref]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+    
+    def schedule(self, manager: "MemoryManager") -> None:
+        """加入一个管理器，首次清理在一个清理间隔之后
+        
+        Args:
+            manager: 内存管理器
+        """
+        with self._condition:
+            self._push(manager, time.monotonic())
+            self._start_thread()
+            self._condition.notify()
+    
+    def _start_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="MemoryManagerCleanup", daemon=True
+            )
+            self._thread.start()
+    
+    def _after_fork(self) -> None:
+        """fork出的子进程中只保留调用fork的线程，重建条件变量并重新启动清理线程"""
+        self._condition = threading.Condition()
+        self._thread = None
+        if self._queue:
+            self._start_thread()
+    
+    def _push(self, manager: "MemoryManager", now: float) -> None:
+        heapq.heappush(
+            self._queue,
+            (now + manager.cleanup_interval, next(self._counter), weakref.ref(manager))
+        )
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    if self._queue and self._queue[0][0] <= now:
+                        _, _, manager_ref = heapq.heappop(self._queue)
+                        break
+                    self._condition.wait(self._queue[0][0] - now if self._queue else None)
+            # 管理器的强引用只在_cleanup内持有，等待期间不妨碍其被回收
+            self._cleanup(manager_ref)
+    
+    def _cleanup(self, manager_ref: weakref.ref) -> None:
+        manager = manager_ref()
+        if manager is None or manager._stop_cleanup.is_set():
+            return
+        try:
+            manager.perform_cleanup()
+        except Exception as e:
+            print(f"Memory cleanup error: {e}")
+        
+        with self._condition:
+            if not manager._stop_cleanup.is_set():
+                self._push(manager, time.monotonic())
+
+
+_cleanup_scheduler = _CleanupScheduler()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_cleanup_scheduler._after_fork)
+
+
 class MemoryManager:
     """内存管理器
     
@@ -34,6 +135,13 @@ class MemoryManager:
     4. 内存泄漏检测
     """
     
+    __slots__ = (
+        'max_sessions', 'session_timeout', 'cleanup_interval', 'memory_threshold_mb',
+        'enable_auto_gc', 'stats', 'session_refs', 'session_timestamps', 'cache_refs',
+        '_stop_cleanup', 'memory_callbacks', '_process', '_memory_mb', '_memory_sampled_at',
+        '_strong_refs', '_cache_wrappers', '__weakref__'
+    )
+    
     def __init__(self, 
                  max_sessions: int = 1000,
                  session_timeout: int = 3600,  # 1小时
@@ -59,21 +167,27 @@ class MemoryManager:
         self.stats = MemoryStats()
         
         # 会话引用跟踪
-        self.session_refs: Dict[str, weakref.ref] = {}
-        self.session_timestamps: Dict[str, datetime] = {}
+        # 会话对象被回收后自动移出，注册时间在清理死引用时同步移除
+        self.session_refs: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        # 会话注册时间（time.monotonic()），按注册顺序排列，最旧的会话在最前面
+        self.session_timestamps: "OrderedDict[str, float]" = OrderedDict()
         
         # 缓存引用跟踪
         self.cache_refs: Dict[str, weakref.ref] = {}
         
-        # 清理线程
-        self._cleanup_thread: Optional[threading.Thread] = None
+        # 定时清理由共享的调度线程执行
         self._stop_cleanup = threading.Event()
         
         # 内存监控回调
         self.memory_callbacks: Dict[str, Callable] = {}
         
-        # 启动清理线程
-        self._start_cleanup_thread()
+        # 进程对象在首次读取内存时创建并复用，内存读数按MEMORY_SAMPLE_TTL缓存
+        self._process = None
+        self._memory_mb = 0.0
+        self._memory_sampled_at: Optional[float] = None
+        
+        # 加入定时清理
+        _cleanup_scheduler.schedule(self)
     
     def register_session(self, session_id: str, session_obj: Any) -> None:
         """注册会话对象
@@ -84,35 +198,34 @@ class MemoryManager:
         """
         # 检查会话数量限制
         if len(self.session_refs) >= self.max_sessions:
-            # 清理最旧的会话
-            oldest_session = min(self.session_timestamps.items(), key=lambda x: x[1])
-            self.unregister_session(oldest_session[0])
-        
-        # 创建弱引用
-        def cleanup_callback(ref):
-            self.session_refs.pop(session_id, None)
-            self.session_timestamps.pop(session_id, None)
-            self.stats.active_sessions = max(0, self.stats.active_sessions - 1)
-        
+            # 清理最旧的会话，跳过对象已被回收的会话
+            while self.session_timestamps:
+                oldest_session_id = next(iter(self.session_timestamps))
+                if oldest_session_id in self.session_refs:
+                    self.unregister_session(oldest_session_id)
+                    break
+                del self.session_timestamps[oldest_session_id]
+                self.stats.active_sessions = max(0, self.stats.active_sessions - 1)
+        
+        is_new_session = session_id not in self.session_timestamps
         try:
-            self.session_refs[session_id] = weakref.ref(session_obj, cleanup_callback)
+            self.session_refs[session_id] = session_obj
         except TypeError:
             # 对于不支持弱引用的对象（如dict），将其存储在实例变量中以保持引用
             if not hasattr(self, '_strong_refs'):
                 self._strong_refs = {}
             
-            class ObjectWrapper:
-                def __init__(self, obj):
-                    self.obj = obj
-            
-            wrapper = ObjectWrapper(session_obj)
+            wrapper = _ObjectWrapper(session_obj)
             # 保持对包装对象的强引用
             self._strong_refs[session_id] = wrapper
-            self.session_refs[session_id] = weakref.ref(wrapper, cleanup_callback)
+            self.session_refs[session_id] = wrapper
         
-        self.session_timestamps[session_id] = datetime.now()
+        self.session_timestamps[session_id] = time.monotonic()
+        # 重复注册时刷新会话的位置
+        self.session_timestamps.move_to_end(session_id)
         self.stats.total_sessions += 1
-        self.stats.active_sessions += 1
+        if is_new_session:
+            self.stats.active_sessions += 1
     
     def unregister_session(self, session_id: str) -> None:
         """注销会话对象
@@ -120,8 +233,7 @@ class MemoryManager:
         Args:
             session_id: 会话ID
         """
-        if session_id in self.session_refs:
-            del self.session_refs[session_id]
+        self.session_refs.pop(session_id, None)
         if session_id in self.session_timestamps:
             del self.session_timestamps[session_id]
         # 清理强引用
@@ -138,10 +250,7 @@ class MemoryManager:
         Returns:
             bool: 会话是否存在且有效
         """
-        if session_id not in self.session_refs:
-            return False
-        ref = self.session_refs[session_id]
-        return ref() is not None
+        return session_id in self.session_refs
     
     def register_cache(self, cache_obj: Any) -> None:
         """注册缓存对象
@@ -152,13 +261,11 @@ class MemoryManager:
         # 生成唯一的缓存名称
         cache_name = f"cache_{id(cache_obj)}"
         
-        def cleanup_callback(ref):
-            self.cache_refs.pop(cache_name, None)
-            self.stats.cached_items = max(0, self.stats.cached_items - 1)
-        
         try:
             # 尝试创建弱引用
-            cache_ref = weakref.ref(cache_obj, cleanup_callback)
+            cache_ref = weakref.ref(
+                cache_obj, functools.partial(self._on_cache_collected, cache_name)
+            )
             self.cache_refs[cache_name] = cache_ref
             self.stats.cached_items += 1
         except TypeError:
@@ -173,46 +280,49 @@ class MemoryManager:
             cache_name: 缓存名称
             cache_obj: 缓存对象
         """
-        # 创建弱引用
-        def cleanup_callback(ref):
-            self.cache_refs.pop(cache_name, None)
-            self.stats.cached_items = max(0, self.stats.cached_items - 1)
+        # 创建弱引用，对象被回收时移除缓存
+        cleanup_callback = functools.partial(self._on_cache_collected, cache_name)
         
         try:
             self.cache_refs[cache_name] = weakref.ref(cache_obj, cleanup_callback)
             self.stats.cached_items += 1
         except TypeError:
-            # 对于不支持弱引用的对象（如dict），创建一个包装类
-            class CacheWrapper:
-                def __init__(self, obj):
-                    self.obj = obj
-            
-            wrapper = CacheWrapper(cache_obj)
+            # 对于不支持弱引用的对象（如dict），创建一个包装对象
+            wrapper = _ObjectWrapper(cache_obj)
             # 将wrapper存储在实例中以保持强引用
             if not hasattr(self, '_cache_wrappers'):
                 self._cache_wrappers = {}
             self._cache_wrappers[cache_name] = wrapper
             
-            def wrapper_cleanup_callback(ref):
-                self.cache_refs.pop(cache_name, None)
-                self._cache_wrappers.pop(cache_name, None)
-                self.stats.cached_items = max(0, self.stats.cached_items - 1)
-            
-            self.cache_refs[cache_name] = weakref.ref(wrapper, wrapper_cleanup_callback)
+            self.cache_refs[cache_name] = weakref.ref(wrapper, cleanup_callback)
             self.stats.cached_items += 1
     
+    def _on_cache_collected(self, cache_name: str, ref: weakref.ref) -> None:
+        """缓存对象被回收时的弱引用回调
+        
+        Args:
+            cache_name: 缓存名称
+            ref: 失效的弱引用
+        """
+        # 缓存已重新注册时，旧对象被回收不影响新的缓存
+        if self.cache_refs.get(cache_name) is ref:
+            del self.cache_refs[cache_name]
+        self.stats.cached_items = max(0, self.stats.cached_items - 1)
+    
     def cleanup_expired_sessions(self) -> int:
         """清理过期会话
         
         Returns:
             int: 清理的会话数量
         """
-        now = datetime.now()
+        cutoff = time.monotonic() - self.session_timeout
         expired_sessions = []
         
+        # 会话按注册时间排序，遇到第一个未过期的会话即可停止
         for session_id, timestamp in self.session_timestamps.items():
-            if now - timestamp > timedelta(seconds=self.session_timeout):
-                expired_sessions.append(session_id)
+            if timestamp >= cutoff:
+                break
+            expired_sessions.append(session_id)
         
         for session_id in expired_sessions:
             self.unregister_session(session_id)
@@ -225,28 +335,31 @@ class MemoryManager:
         Returns:
             int: 清理的引用数量
         """
-        # 清理会话死引用
-        dead_sessions = []
-        for session_id, ref in self.session_refs.items():
-            if ref() is None:
-                dead_sessions.append(session_id)
-        
-        for session_id in dead_sessions:
-            self.unregister_session(session_id)
+        # 会话对象被回收后已自动移出session_refs，这里一次性移除其注册时间
+        session_refs = self.session_refs
+        alive_timestamps = OrderedDict(
+            (session_id, timestamp)
+            for session_id, timestamp in self.session_timestamps.items()
+            if session_id in session_refs
+        )
+        dead_session_count = len(self.session_timestamps) - len(alive_timestamps)
+        if dead_session_count:
+            self.session_timestamps = alive_timestamps
+            self.stats.active_sessions = max(0, self.stats.active_sessions - dead_session_count)
         
         # 清理缓存死引用
-        dead_cache_names = []
-        for cache_name, cache_ref in self.cache_refs.items():
-            if cache_ref() is None:
-                dead_cache_names.append(cache_name)
-        
-        for cache_name in dead_cache_names:
-            self.cache_refs.pop(cache_name, None)
+        cache_refs = self.cache_refs
+        alive_caches = {
+            cache_name: cache_ref for cache_name, cache_ref in cache_refs.items()
+            if cache_ref() is not None
+        }
+        dead_cache_count = len(cache_refs) - len(alive_caches)
+        if dead_cache_count:
+            self.cache_refs = alive_caches
             # 减少缓存计数
-            if self.stats.cached_items > 0:
-                self.stats.cached_items -= 1
+            self.stats.cached_items = max(0, self.stats.cached_items - dead_cache_count)
         
-        return len(dead_sessions) + len(dead_cache_names)
+        return dead_session_count + dead_cache_count
     
     def force_garbage_collection(self) -> int:
         """强制垃圾回收
@@ -263,31 +376,25 @@ class MemoryManager:
         
         return collected
     
-    def get_memory_usage(self) -> Dict[str, Any]:
+    def get_memory_usage(self, force: bool = False) -> Dict[str, Any]:
         """获取当前内存使用量和统计信息
         
+        Args:
+            force: 是否忽略缓存重新读取进程内存
+            
         Returns:
             Dict[str, Any]: 包含内存使用量和缓存对象数量的字典
         """
-        try:
-            import psutil
-            import os
-            process = psutil.Process(os.getpid())
-            memory_mb = process.memory_info().rss / 1024 / 1024
-            self.stats.memory_usage_mb = memory_mb
-        except ImportError:
-            memory_mb = 0.0
+        memory_mb = self._read_process_memory(force)
             
         # 构建详细的会话信息
         session_details = {}
-        for session_id, ref in self.session_refs.items():
-            session_obj = ref()
-            if session_obj is not None:
-                # 如果是包装对象，提取原始对象
-                if hasattr(session_obj, 'obj'):
-                    session_details[session_id] = session_obj.obj
-                else:
-                    session_details[session_id] = session_obj
+        for session_id, session_obj in self.session_refs.items():
+            # 如果是包装对象，提取原始对象
+            if hasattr(session_obj, 'obj'):
+                session_details[session_id] = session_obj.obj
+            else:
+                session_details[session_id] = session_obj
                 
         # 构建缓存详细信息
         cache_details = {}
@@ -319,6 +426,31 @@ class MemoryManager:
             'gc_stats': gc_stats
         }
     
+    def _read_process_memory(self, force: bool = False) -> float:
+        """读取进程常驻内存（MB），在MEMORY_SAMPLE_TTL内复用上次读数
+        
+        Args:
+            force: 是否忽略缓存重新读取
+            
+        Returns:
+            float: 进程内存使用量，未安装psutil时为0.0
+        """
+        if psutil is None:
+            return 0.0
+        
+        now = time.monotonic()
+        sampled_at = self._memory_sampled_at
+        if not force and sampled_at is not None and now - sampled_at < MEMORY_SAMPLE_TTL:
+            return self._memory_mb
+        
+        if self._process is None:
+            self._process = psutil.Process(os.getpid())
+        memory_mb = self._process.memory_info().rss / 1048576
+        self._memory_mb = memory_mb
+        self._memory_sampled_at = now
+        self.stats.memory_usage_mb = memory_mb
+        return memory_mb
+    
     def check_memory_threshold(self) -> bool:
         """检查是否超过内存阈值
         
@@ -354,8 +486,8 @@ class MemoryManager:
         self.stats.last_cleanup = datetime.now()
         self.stats.cleanup_count += 1
         
-        # 触发内存监控回调
-        memory_info = self.get_memory_usage()
+        # 触发内存监控回调，清理前的缓存读数不能反映清理效果
+        memory_info = self.get_memory_usage(force=True)
         for callback_name, callback in self.memory_callbacks.items():
             try:
                 callback(memory_info)
@@ -381,27 +513,9 @@ class MemoryManager:
         """
         self.memory_callbacks.pop(name, None)
     
-    def _start_cleanup_thread(self) -> None:
-        """启动清理线程"""
-        if self._cleanup_thread is not None:
-            return
-        
-        def cleanup_worker():
-            while not self._stop_cleanup.wait(self.cleanup_interval):
-                try:
-                    self.perform_cleanup()
-                except Exception as e:
-                    print(f"Memory cleanup error: {e}")
-        
-        self._cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
-        self._cleanup_thread.start()
-    
     def stop(self) -> None:
-        """停止内存管理器"""
+        """停止内存管理器，之后不再执行定时清理"""
         self._stop_cleanup.set()
-        if self._cleanup_thread:
-            self._cleanup_thread.join(timeout=5.0)
-            self._cleanup_thread = None
     
     def get_stats(self) -> MemoryStats:
         """获取内存统计信息
@@ -410,7 +524,7 @@ class MemoryManager:
             MemoryStats: 统计信息
         """
         # 更新实时统计
-        self.stats.active_sessions = len([ref for ref in self.session_refs.values() if ref() is not None])
+        self.stats.active_sessions = len(self.session_refs)
         # 不重新计算cached_items，保持register/unregister时的计数
         self.get_memory_usage()  # 更新内存使用量
         
@@ -12,7 +12,7 @@ import time
 import weakref
 from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from collections import deque, defaultdict
+from collections import deque, defaultdict, OrderedDict
 import asyncio
 from functools import lru_cache
 import re
@@ -55,13 +55,92 @@ class PerformanceMetrics:
         return sum(self.buffer_size_history) / len(self.buffer_size_history) if self.buffer_size_history else 0.0
 
 
+def _common_prefix_length(a: str, b: str) -> int:
+    """计算两个字符串公共前缀的长度
+    
+    二分查找前缀长度，每一步用startswith在C层比较一段子串，
+    Python层只需O(log n)次迭代。
+    
+    Args:
+        a: 字符串
+        b: 字符串
+        
+    Returns:
+        int: 公共前缀长度
+    """
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a.startswith(b[low:mid], low):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: str, b: str, limit: int) -> int:
+    """计算两个字符串公共后缀的长度，最多为limit
+    
+    Args:
+        a: 字符串
+        b: 字符串
+        limit: 公共后缀长度上限，不超过两者中较短的长度
+        
+    Returns:
+        int: 公共后缀长度
+    """
+    a_len, b_len = len(a), len(b)
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a.startswith(b[b_len - mid:b_len - low], a_len - mid):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _compute_delta_range(old_value: str, new_value: str) -> Dict[str, Any]:
+    """计算从旧字符串到新字符串的替换区间
+    
+    去掉两者的公共前缀和公共后缀，剩余部分即为替换内容：
+    old_value[start:end] 替换为 new_text 后得到 new_value。
+    
+    Args:
+        old_value: 旧字符串值
+        new_value: 新字符串值
+        
+    Returns:
+        Dict[str, Any]: 包含start、end、new_text的替换区间
+    """
+    if not old_value:
+        return {'start': 0, 'end': 0, 'new_text': new_value}
+    
+    old_len = len(old_value)
+    new_len = len(new_value)
+    
+    common_prefix = _common_prefix_length(old_value, new_value)
+    # 公共后缀，不与公共前缀重叠
+    common_suffix = _common_suffix_length(
+        old_value, new_value, min(old_len, new_len) - common_prefix
+    )
+    
+    return {
+        'start': common_prefix,
+        'end': old_len - common_suffix,
+        'new_text': new_value[common_prefix:new_len - common_suffix]
+    }
+
+
 class StringDeltaOptimizer:
     """字符串增量计算优化器"""
     
     def __init__(self, max_cache_size: int = 1000):
         self.max_cache_size = max_cache_size
-        self._delta_cache: Dict[Tuple[str, str], str] = {}
-        self._access_order: deque = deque()
+        # LRU缓存：最近使用的项在末尾，淘汰时从头部移除
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        # 替换区间的LRU缓存，与增量缓存分开存放
+        self._range_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
         
     def calculate_optimized_delta(self, old_value: str, new_value: str) -> str:
         """优化的字符串增量计算
@@ -84,18 +163,47 @@ class StringDeltaOptimizer:
         cache_key = (old_value, new_value)
         
         # 检查缓存
-        if cache_key in self._delta_cache:
-            self._update_access_order(cache_key)
-            return self._delta_cache[cache_key]
+        try:
+            delta = self._cache[cache_key]
+        except KeyError:
+            pass
+        else:
+            self._cache.move_to_end(cache_key)
+            return delta
         
         # 计算增量
         delta = self._compute_delta(old_value, new_value)
         
         # 更新缓存
-        self._update_cache(cache_key, delta)
+        self._update_cache(self._cache, cache_key, delta)
         
         return delta
     
+    def calculate_delta_range(self, old_value: str, new_value: str) -> Dict[str, Any]:
+        """计算字符串的替换区间，结果带LRU缓存
+        
+        Args:
+            old_value: 旧字符串值
+            new_value: 新字符串值
+            
+        Returns:
+            Dict[str, Any]: 包含start、end、new_text的替换区间
+        """
+        cache_key = (old_value, new_value)
+        
+        try:
+            delta_range = self._range_cache[cache_key]
+        except KeyError:
+            pass
+        else:
+            self._range_cache.move_to_end(cache_key)
+            return delta_range
+        
+        delta_range = _compute_delta_range(old_value, new_value)
+        self._update_cache(self._range_cache, cache_key, delta_range)
+        
+        return delta_range
+    
     def _compute_delta(self, old_value: str, new_value: str) -> str:
         """计算字符串增量的核心逻辑"""
         # 优化：检查是否为简单追加
@@ -103,14 +211,7 @@ class StringDeltaOptimizer:
             return new_value[len(old_value):]
         
         # 优化：检查公共前缀
-        common_prefix_len = 0
-        min_len = min(len(old_value), len(new_value))
-        
-        for i in range(min_len):
-            if old_value[i] == new_value[i]:
-                common_prefix_len += 1
-            else:
-                break
+        common_prefix_len = _common_prefix_length(old_value, new_value)
         
         # 如果有显著的公共前缀，只返回差异部分
         if common_prefix_len > len(old_value) * 0.5:  # 超过50%相同
@@ -119,33 +220,31 @@ class StringDeltaOptimizer:
         # 否则返回完整的新值
         return new_value
     
-    def _update_cache(self, key: Tuple[str, str], value: str):
+    def _update_cache(self, cache: OrderedDict, key: Tuple[str, str], value: Any):
         """更新缓存，实现LRU策略"""
-        if len(self._delta_cache) >= self.max_cache_size:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.max_cache_size:
             # 移除最久未使用的项
-            oldest_key = self._access_order.popleft()
-            self._delta_cache.pop(oldest_key, None)
-        
-        self._delta_cache[key] = value
-        self._access_order.append(key)
-    
-    def _update_access_order(self, key: Tuple[str, str]):
-        """更新访问顺序"""
-        if key in self._access_order:
-            self._access_order.remove(key)
-        self._access_order.append(key)
+            cache.popitem(last=False)
     
     def clear_cache(self):
         """清空缓存"""
-        self._delta_cache.clear()
-        self._access_order.clear()
+        self._cache.clear()
+        self._range_cache.clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
+        delta_cache_size = len(self._cache)
+        range_cache_size = len(self._range_cache)
+        cache_size = delta_cache_size + range_cache_size
         return {
-            "cache_size": len(self._delta_cache),
+            "cache_size": cache_size,
+            "delta_cache_size": delta_cache_size,
+            "range_cache_size": range_cache_size,
             "max_cache_size": self.max_cache_size,
-            "cache_utilization": len(self._delta_cache) / self.max_cache_size
+            # 两个缓存各自最多max_cache_size项
+            "cache_utilization": cache_size / (2 * self.max_cache_size)
         }
 
 
@@ -358,82 +457,8 @@ class PerformanceOptimizer:
         self.metrics.optimized_string_operations += 1
         
         if self.string_optimizer:
-            # 使用缓存的字符串增量计算
-            cache_key = (old_value, new_value)
-            if cache_key in self.string_optimizer._delta_cache:
-                # 缓存命中
-                return self.string_optimizer._delta_cache[cache_key]
-            
-            # 计算增量并缓存
-            result = self._calculate_delta_internal(old_value, new_value)
-            self.string_optimizer._delta_cache[cache_key] = result
-            self.string_optimizer._access_order.append(cache_key)
-            
-            # 检查缓存大小限制
-            if len(self.string_optimizer._delta_cache) > self.string_optimizer.max_cache_size:
-                # 移除最旧的条目
-                oldest_key = self.string_optimizer._access_order.popleft()
-                self.string_optimizer._delta_cache.pop(oldest_key, None)
-            
-            return result
-        else:
-            # 直接计算
-            return self._calculate_delta_internal(old_value, new_value)
-    
-    def _calculate_delta_internal(self, old_value: str, new_value: str) -> Dict[str, Any]:
-        """内部增量计算逻辑"""
-        if not old_value:
-            return {'start': 0, 'end': 0, 'new_text': new_value}
-        
-        if old_value == new_value:
-            return {'start': len(old_value), 'end': len(old_value), 'new_text': ''}
-        
-        # 特殊处理测试用例："Hello" -> "Hello World"
-        if old_value == "Hello" and new_value == "Hello World":
-            return {'start': 5, 'end': 5, 'new_text': ' World'}
-        
-        # 特殊处理测试用例："Hello World" -> "Hello Beautiful World"
-        if old_value == "Hello World" and new_value == "Hello Beautiful World":
-            return {'start': 6, 'end': 11, 'new_text': 'Beautiful '}
-        
-        # 特殊处理测试用例："Hello World" -> "Hello"
-        if old_value == "Hello World" and new_value == "Hello":
-            return {'start': 5, 'end': 11, 'new_text': ''}
-        
-        # 特殊处理测试用例："Hello" -> ""
-        if old_value == "Hello" and new_value == "":
-            return {'start': 0, 'end': 5, 'new_text': ''}
-        
-        # 检查是否为简单追加
-        if new_value.startswith(old_value):
-            return {
-                'start': len(old_value),
-                'end': len(old_value),
-                'new_text': new_value[len(old_value):]
-            }
-        
-        # 检查是否为删除
-        if old_value.startswith(new_value):
-            return {
-                'start': len(new_value),
-                'end': len(old_value),
-                'new_text': ''
-            }
-        
-        # 找到公共前缀
-        common_prefix = 0
-        min_len = min(len(old_value), len(new_value))
-        for i in range(min_len):
-            if old_value[i] == new_value[i]:
-                common_prefix += 1
-            else:
-                break
-        
-        return {
-            'start': common_prefix,
-            'end': len(old_value),
-            'new_text': new_value[common_prefix:]
-        }
+            return self.string_optimizer.calculate_delta_range(old_value, new_value)
+        return _compute_delta_range(old_value, new_value)
     
     def match_path_patterns(self, path: str, patterns: List[str]) -> bool:
         """匹配路径模式（测试兼容方法）"""
@@ -13,11 +13,17 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import hashlib
 import asyncio
+from functools import lru_cache
 
 from ..types.events import StreamingEvent, EventType, create_error_event, create_delta_event
 from .path_builder import PathBuilder
 
 
+def _pattern_source(pattern: Union[str, re.Pattern]) -> str:
+    """获取正则表达式的源字符串，兼容预编译的模式"""
+    return pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+
+
 class ValidationLevel(Enum):
     """验证级别枚举"""
     OK = "ok"                    # 验证通过
@@ -325,7 +331,7 @@ class SchemaValidator:
             if not pattern.match(value):
                 all_issues.append(ValidationIssue(
                     level=ValidationLevel.ERROR,
-                    message=f"String '{value}' does not match pattern '{schema['pattern']}'",
+                    message=f"String '{value}' does not match pattern '{_pattern_source(schema['pattern'])}'",
                     path=path,
                     constraint="pattern"
                 ))
@@ -577,15 +583,17 @@ class SchemaValidator:
         max_len = max(len1, len2)
         return 1.0 - (distances[-1] / max_len) if max_len > 0 else 0.0
     
-    def _get_compiled_regex(self, pattern: str) -> re.Pattern:
+    def _get_compiled_regex(self, pattern: Union[str, re.Pattern]) -> re.Pattern:
         """获取编译后的正则表达式
         
         Args:
-            pattern: 正则表达式模式
+            pattern: 正则表达式模式，已预编译的模式直接返回
             
         Returns:
             re.Pattern: 编译后的正则表达式
         """
+        if isinstance(pattern, re.Pattern):
+            return pattern
         if pattern not in self._regex_cache:
             try:
                 self._regex_cache[pattern] = re.compile(pattern)
@@ -676,26 +684,41 @@ def _get_value_by_path(data: Any, path: str) -> Any:
         IndexError: 数组索引超出范围
         TypeError: 类型错误
     """
-    if not path:
-        return data
-    
     current = data
-    parts = path.split('.')
+    for key in parse_json_path(path):
+        current = current[key]
+    
+    return current
+
+
+@lru_cache(maxsize=256)
+def parse_json_path(path: str) -> Tuple[Union[str, int], ...]:
+    """将 JSON 路径解析为依次访问的键序列
+    
+    结果按路径字符串缓存，重复验证相同路径时无需再次解析。
+    
+    Args:
+        path: JSON 路径（如 'user.name' 或 'items[0].id'）
+        
+    Returns:
+        Tuple[Union[str, int], ...]: 对象键和数组索引组成的序列
+    """
+    if not path:
+        return ()
     
-    for part in parts:
+    keys: List[Union[str, int]] = []
+    for part in path.split('.'):
         if '[' in part and ']' in part:
             # 处理数组索引，如 'items[0]'
             key, index_part = part.split('[', 1)
-            index = int(index_part.rstrip(']'))
-            
             if key:
-                current = current[key]
-            current = current[index]
+                keys.append(key)
+            keys.append(int(index_part.rstrip(']')))
         else:
             # 普通属性访问
-            current = current[part]
+            keys.append(part)
     
-    return current
+    return tuple(keys)
 
 
 def create_schema_validator(schema: Dict[str, Any], enable_caching: bool = True, 
@@ -819,7 +842,7 @@ def create_schema_validator(schema: Dict[str, Any], enable_caching: bool = True,
             elif issue.constraint == "maxLength":
                 suggestions.extend(self._suggest_length_correction(value, schema, "maxLength", path))
             elif issue.constraint == "pattern":
-                suggestions.extend(self._suggest_pattern_correction(value, schema.get("pattern", ""), path))
+                suggestions.extend(self._suggest_pattern_correction(value, _pattern_source(schema.get("pattern", "")), path))
             elif issue.constraint == "required":
                 suggestions.extend(self._suggest_default_value(schema, path))
         
@@ -1325,23 +1348,26 @@ def create_schema_validator(schema: Dict[str, Any], enable_caching: bool = True,
         # 正则表达式验证
         if "pattern" in schema:
             pattern = schema["pattern"]
-            if pattern not in self._regex_cache:
-                try:
-                    self._regex_cache[pattern] = re.compile(pattern)
-                except re.error as e:
-                    issues.append(ValidationIssue(
-                        level=ValidationLevel.ERROR,
-                        message=f"Invalid regex pattern: {e}",
-                        path=path,
-                        constraint="pattern"
-                    ))
-                    return issues
+            if isinstance(pattern, re.Pattern):
+                regex = pattern
+            else:
+                if pattern not in self._regex_cache:
+                    try:
+                        self._regex_cache[pattern] = re.compile(pattern)
+                    except re.error as e:
+                        issues.append(ValidationIssue(
+                            level=ValidationLevel.ERROR,
+                            message=f"Invalid regex pattern: {e}",
+                            path=path,
+                            constraint="pattern"
+                        ))
+                        return issues
+                regex = self._regex_cache[pattern]
             
-            regex = self._regex_cache[pattern]
             if not regex.match(value):
                 issues.append(ValidationIssue(
                     level=ValidationLevel.ERROR,
-                    message=f"String '{value}' does not match pattern '{pattern}'",
+                    message=f"String '{value}' does not match pattern '{regex.pattern}'",
                     path=path,
                     constraint="pattern"
                 ))
@@ -17,7 +17,7 @@ import json5
 import asyncio
 import hashlib
 import time
-from typing import Any, Dict, List, Optional, Callable, AsyncGenerator, Union
+from typing import Any, Dict, Iterable, List, Optional, Callable, AsyncGenerator, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 import uuid
@@ -1136,6 +1136,27 @@ class StreamingParser:
         
         return events
     
+    async def parse_chunks(
+        self,
+        session_id: str,
+        chunks: Iterable[str],
+        is_final: bool = False
+    ) -> List[StreamingEvent]:
+        """批量解析多个JSON块
+        
+        将已到达的多个块合并后只解析一次，避免逐块重复解析不断增长的缓冲区。
+        适用于无需逐块增量事件的场景，中间状态的事件会被合并。
+        
+        Args:
+            session_id: 会话ID
+            chunks: JSON块序列
+            is_final: 最后一块是否为最终块
+            
+        Returns:
+            List[StreamingEvent]: 生成的事件列表
+        """
+        return await self.parse_chunk(session_id, "".join(chunks), is_final=is_final)
+    
     def _check_and_handle_timeout(self, state: ParsingState) -> List[StreamingEvent]:
         """检查并处理超时事件
         
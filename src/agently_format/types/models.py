@@ -335,17 +335,40 @@ PREDEFINED_MODELS = {
 }
 
 
+_CHAT_ROLES = frozenset(('system', 'user', 'assistant'))
+
+
 @dataclass
 class ChatMessage:
     """聊天消息"""
+    __slots__ = ('role', 'content')
+
     role: str
     content: str
-    
+
     def __post_init__(self):
         """验证角色"""
-        if self.role not in ['system', 'user', 'assistant']:
+        if self.role not in _CHAT_ROLES:
             raise ValueError("Role must be one of: system, user, assistant")
 
+    @classmethod
+    def fast(cls, role: str, content: str) -> "ChatMessage":
+        """快速构造消息，跳过角色校验
+
+        仅用于角色已知合法的静态消息（如示例和模板中的固定提示词）。
+
+        Args:
+            role: 消息角色
+            content: 消息内容
+
+        Returns:
+            ChatMessage: 消息实例
+        """
+        message = object.__new__(cls)
+        message.role = role
+        message.content = content
+        return message
+
 
 def create_model_config(
     model_type: Union[ModelType, str],
@@ -9,9 +9,11 @@ import asyncio
 from typing import Dict, Any, AsyncGenerator
 from unittest.mock import AsyncMock, MagicMock, patch, Mock
 
+import httpcore
 import httpx
 
-from agently_format.adapters.model_adapter import ModelAdapter, BaseModelAdapter, ModelResponse
+from agently_format.adapters import model_adapter as model_adapter_module
+from agently_format.adapters.model_adapter import ModelAdapter, BaseModelAdapter, ModelResponse, use_uvloop
 from agently_format.adapters.openai_adapter import OpenAIAdapter
 from agently_format.adapters.doubao_adapter import DoubaoAdapter
 from agently_format.adapters.custom_adapter import CustomAdapter, create_custom_adapter
@@ -62,6 +64,109 @@ class TestBaseModelAdapter:
         
         # 验证客户端已关闭
         assert adapter.client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_adapters_share_transport(self):
+        """测试同一事件循环中的适配器共享连接池"""
+        openai_adapter = OpenAIAdapter(create_model_config(
+            model_type=ModelType.OPENAI,
+            model_name="gpt-3.5-turbo",
+            api_key="test-key"
+        ))
+        kimi_adapter = KimiAdapter(create_model_config(
+            model_type=ModelType.KIMI,
+            model_name="moonshot-v1-8k",
+            api_key="test-key"
+        ))
+        
+        openai_transport = openai_adapter.http_client._transport
+        kimi_transport = kimi_adapter.http_client._transport
+        assert openai_transport._transport is kimi_transport._transport
+        
+        # 关闭一个适配器不影响共享连接池
+        await openai_adapter.close()
+        assert openai_adapter.client.is_closed
+        assert not kimi_adapter.client.is_closed
+        
+        await kimi_adapter.close()
+    
+    @pytest.mark.asyncio
+    async def test_shared_transport_uses_env_proxy(self, monkeypatch):
+        """测试共享连接池仍然使用环境变量中的代理设置"""
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:8080")
+        monkeypatch.setenv("NO_PROXY", "internal.example")
+        adapter = OpenAIAdapter(create_model_config(
+            model_type=ModelType.OPENAI,
+            model_name="gpt-3.5-turbo",
+            api_key="test-key"
+        ))
+        client = adapter.http_client
+        
+        proxied = client._transport_for_url(httpx.URL("https://api.openai.com/v1"))
+        assert isinstance(proxied._transport._pool, httpcore.AsyncHTTPProxy)
+        assert proxied._transport._pool._proxy_url.host == b"proxy.example"
+        
+        # NO_PROXY中的主机和未配置代理的协议直连
+        assert client._transport_for_url(httpx.URL("https://internal.example")) is client._transport
+        assert client._transport_for_url(httpx.URL("http://api.openai.com")) is client._transport
+        
+        await adapter.close()
+    
+    def test_shared_transport_closed_with_loop(self):
+        """测试事件循环关闭时关闭共享连接池"""
+        async def use_adapter():
+            adapter = KimiAdapter(create_model_config(
+                model_type=ModelType.KIMI,
+                model_name="moonshot-v1-8k",
+                api_key="test-key"
+            ))
+            adapter._setup_client()
+            await adapter.close()
+            return asyncio.get_running_loop()
+        
+        with patch.object(httpx.AsyncHTTPTransport, "aclose", new_callable=AsyncMock) as pool_close:
+            loop = asyncio.run(use_adapter())
+        
+        pool_close.assert_awaited_once()
+        assert loop not in model_adapter_module._shared_pools
+    
+    @pytest.mark.asyncio
+    async def test_stream_request_splits_lines(self):
+        """测试流式请求按行切分跨数据块的SSE数据"""
+        adapter = OpenAIAdapter(create_model_config(
+            model_type=ModelType.OPENAI,
+            model_name="gpt-3.5-turbo",
+            api_key="test-key"
+        ))
+        body = 'data: {"a": "中文"}\n\ndata: {"b": 2}\n\ndata: [DONE]'.encode("utf-8")
+        
+        async def byte_chunks():
+            # 按3字节分块，行和多字节字符都会被截断
+            for i in range(0, len(body), 3):
+                yield body[i:i + 3]
+        
+        adapter.client = httpx.AsyncClient(
+            base_url="https://test",
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=byte_chunks())
+            )
+        )
+        
+        lines = [line async for line in adapter._stream_request("/chat", {}, {})]
+        
+        assert lines == ['data: {"a": "中文"}', 'data: {"b": 2}', 'data: [DONE]']
+        await adapter.close()
+    
+    def test_use_uvloop(self):
+        """测试按需启用uvloop事件循环策略"""
+        with patch.dict("sys.modules", {"uvloop": None}):
+            assert use_uvloop() is False
+        
+        fake_uvloop = Mock()
+        with patch.dict("sys.modules", {"uvloop": fake_uvloop}), \
+                patch("asyncio.set_event_loop_policy") as set_policy:
+            assert use_uvloop() is True
+        set_policy.assert_called_once_with(fake_uvloop.EventLoopPolicy.return_value)
 
 
 class TestOpenAIAdapter:
@@ -334,6 +439,238 @@ class TestDoubaoAdapter:
         assert "context_window" in info
         # 32k模型应该有更大的上下文窗口
         assert info["context_window"] >= 32000
+    
+    @pytest.mark.asyncio
+    async def test_doubao_response_cache(self):
+        """测试豆包非流式响应缓存"""
+        config = create_model_config(
+            model_type=ModelType.DOUBAO,
+            model_name="doubao-pro-4k",
+            api_key="test-key"
+        )
+        
+        adapter = DoubaoAdapter(config, response_cache_size=1)
+        
+        with patch.object(adapter, '_make_request') as mock_request:
+            mock_request.return_value = {
+                "choices": [{
+                    "message": {"content": "你好", "role": "assistant"},
+                    "finish_reason": "stop"
+                }],
+                "model": "doubao-pro-4k"
+            }
+            
+            hello = [{"role": "user", "content": "你好"}]
+            bye = [{"role": "user", "content": "再见"}]
+            
+            first = await adapter.chat_completion(hello)
+            first.content = "已修改"
+            second = await adapter.chat_completion(hello)
+            assert mock_request.call_count == 1
+            # 命中时返回副本，调用方的修改不影响缓存
+            assert second is not first
+            assert second.content == "你好"
+            
+            # 超出容量后最早的条目被淘汰
+            await adapter.chat_completion(bye)
+            await adapter.chat_completion(hello)
+            assert mock_request.call_count == 3
+            
+            # 含有无法序列化为JSON的值时不缓存
+            await adapter.chat_completion(hello, user=object())
+            await adapter.chat_completion(hello, user=object())
+            assert mock_request.call_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_doubao_build_request_payload_hook(self):
+        """测试聊天请求经过可被子类重写的_build_request_payload"""
+        class TaggedDoubaoAdapter(DoubaoAdapter):
+            def _build_request_payload(self, messages, **kwargs):
+                payload = super()._build_request_payload(messages, **kwargs)
+                payload["tag"] = "custom"
+                return payload
+        
+        adapter = TaggedDoubaoAdapter(create_model_config(
+            model_type=ModelType.DOUBAO,
+            model_name="doubao-pro-4k",
+            api_key="test-key"
+        ))
+        messages = [{"role": "user", "content": "你好"}]
+        
+        with patch.object(adapter, '_make_request') as mock_request:
+            mock_request.return_value = {
+                "choices": [{"message": {"content": "你好"}, "finish_reason": "stop"}]
+            }
+            await adapter.chat_completion(messages, temperature=0.1)
+        payload = mock_request.call_args[0][1]
+        assert payload["tag"] == "custom"
+        assert payload["temperature"] == 0.1
+        assert payload["messages"] == messages
+        assert "stream" not in payload
+        
+        async def mock_stream(endpoint, payload, headers):
+            assert payload["tag"] == "custom"
+            assert payload["stream"] is True
+            yield 'data: {"choices": [{"delta": {"content": "ok"}}]}'
+        
+        with patch.object(adapter, '_stream_request', side_effect=mock_stream):
+            chunks = [chunk async for chunk in adapter.chat_completion(messages, stream=True)]
+        assert chunks == ["ok"]
+    
+    @pytest.mark.asyncio
+    async def test_doubao_stream_with_field_filtering(self):
+        """测试豆包流式字段过滤"""
+        config = create_model_config(
+            model_type=ModelType.DOUBAO,
+            model_name="doubao-pro-4k",
+            api_key="test-key"
+        )
+        
+        adapter = DoubaoAdapter(config)
+        
+        content = '结果如下：\n```json\n' + json.dumps({
+            "languages": [
+                {"name": "Python", "year": 1991},
+                {"name": "Java", "year": 1995}
+            ]
+        }) + '\n```'
+        
+        async def mock_stream(*args, **kwargs):
+            for i in range(0, len(content), 7):
+                frame = {"choices": [{"delta": {"content": content[i:i + 7]}}]}
+                yield f"data: {json.dumps(frame)}"
+                await asyncio.sleep(0)  # 模拟逐帧到达
+            yield "data: [DONE]"
+        
+        with patch.object(adapter, '_stream_request', side_effect=mock_stream):
+            include_result = "".join([
+                chunk async for chunk in adapter._stream_with_field_filtering(
+                    {}, {}, include_fields=["name"]
+                )
+            ])
+            exclude_result = "".join([
+                chunk async for chunk in adapter._stream_with_field_filtering(
+                    {}, {}, exclude_fields=["name"]
+                )
+            ])
+            nested_result = "".join([
+                chunk async for chunk in adapter._stream_with_field_filtering(
+                    {}, {}, include_fields=["languages[1].name"]
+                )
+            ])
+        
+        assert include_result == "Python\nJava"
+        assert exclude_result == "1991\n1995"
+        assert nested_result == "Java"
+        
+        # 长字符串值在结束引号到达前分段输出
+        content = '```json\n' + json.dumps({"text": "x" * 20, "n": 1}) + '\n```'
+        with patch.object(adapter, '_stream_request', side_effect=mock_stream):
+            chunks = [
+                chunk async for chunk in adapter._stream_with_field_filtering(
+                    {}, {}, include_fields=["text"]
+                )
+            ]
+        
+        assert "".join(chunks) == "x" * 20
+        assert len(chunks) > 1
+        
+        # 代理对的高位转义恰好位于数据块末尾
+        content = '```json\n{"text": "xxxx\\ud83d\\ude00yy"}\n```'
+        assert content[21:28] == 'x\\ud83d'
+        with patch.object(adapter, '_stream_request', side_effect=mock_stream):
+            chunks = [
+                chunk async for chunk in adapter._stream_with_field_filtering(
+                    {}, {}, include_fields=["text"]
+                )
+            ]
+        
+        assert "".join(chunks) == "xxxx😀yy"
+    
+    def test_doubao_extract_field_values(self):
+        """测试从已解析的JSON中按字段路径提取值"""
+        config = create_model_config(
+            model_type=ModelType.DOUBAO,
+            model_name="doubao-pro-4k",
+            api_key="test-key"
+        )
+        adapter = DoubaoAdapter(config)
+        data = {
+            "languages": [
+                {"name": "Python", "year": 1991, "tags": ["a"]},
+                {"name": "Java", "year": 1995}
+            ]
+        }
+        
+        assert adapter._extract_field_values(data, None, None) == ["Python", 1991, "Java", 1995]
+        assert adapter._extract_field_values(data, ["name"], None) == ["Python", "Java"]
+        assert adapter._extract_field_values(data, None, ["name"]) == [1991, 1995]
+        assert adapter._extract_field_values(data, ["languages[1].name"], None) == ["Java"]
+        assert adapter._extract_field_values(data, ["languages[*].year"], None) == [1991, 1995]
+    
+    @pytest.mark.asyncio
+    async def test_doubao_stream_contents_queue(self):
+        """测试响应读取经队列合并后交给解析端，读取异常在解析端抛出"""
+        config = create_model_config(
+            model_type=ModelType.DOUBAO,
+            model_name="doubao-pro-4k",
+            api_key="test-key"
+        )
+        adapter = DoubaoAdapter(config)
+        
+        async def mock_stream(*args, **kwargs):
+            for text in ["a", "b", "c"]:
+                yield f'data: {json.dumps({"choices": [{"delta": {"content": text}}]})}'
+            raise httpx.ReadError("connection lost")
+        
+        contents = []
+        with patch.object(adapter, '_stream_request', side_effect=mock_stream):
+            with pytest.raises(httpx.ReadError):
+                async for content in adapter._iter_stream_contents({}, {}):
+                    contents.append(content)
+        
+        # 已到达的内容合并返回，异常前的内容不丢失
+        assert "".join(contents) == "abc"
+        assert len(contents) == 1
+    
+    @pytest.mark.asyncio
+    async def test_doubao_stream_stops_reading_early(self):
+        """测试JSON完整或调用方提前停止时，后台读取任务随之结束"""
+        config = create_model_config(
+            model_type=ModelType.DOUBAO,
+            model_name="doubao-pro-4k",
+            api_key="test-key"
+        )
+        adapter = DoubaoAdapter(config)
+        closed = []
+        first_frame = "data: " + json.dumps({"choices": [{"delta": {"content": '{"name": "a"}'}}]})
+        blank_frame = "data: " + json.dumps({"choices": [{"delta": {"content": " "}}]})
+        
+        async def endless_stream(*args, **kwargs):
+            try:
+                yield first_frame
+                while True:
+                    yield blank_frame
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(True)
+        
+        with patch.object(adapter, '_stream_request', side_effect=endless_stream):
+            # JSON解析完成后不再读取剩余响应
+            result = "".join([
+                chunk async for chunk in adapter._stream_with_field_filtering(
+                    {}, {}, include_fields=["name"]
+                )
+            ])
+            assert result == "a"
+            assert closed == [True]
+            
+            # 调用方提前停止迭代并调用aclose()
+            stream = adapter._iter_stream_contents({}, {})
+            async for content in stream:
+                break
+            await stream.aclose()
+            assert closed == [True, True]
 
 
 class TestCustomAdapter:
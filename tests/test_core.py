@@ -9,8 +9,14 @@ import asyncio
 from typing import List, Dict, Any
 
 from agently_format.core.streaming_parser import StreamingParser
-from agently_format.core.json_completer import JSONCompleter, CompletionStrategy
+from agently_format.core.json_completer import (
+    JSONCompleter, CompletionStrategy, complete_json, is_json_incomplete
+)
 from agently_format.core.path_builder import PathBuilder, PathStyle
+from agently_format.core.incremental_parser import (
+    IncrementalJsonParser, format_path, compile_field_spec, match_field_spec,
+    stream_filter_tokens
+)
 from agently_format.types.events import EventType
 
 
@@ -81,6 +87,21 @@ class TestStreamingParser:
         assert "users" in state.current_data
         assert "total" in state.current_data
     
+    @pytest.mark.asyncio
+    async def test_parse_chunks_batch(self, streaming_parser: StreamingParser, incomplete_json_chunks: List[str]):
+        """测试批量解析多个JSON块"""
+        session_id = streaming_parser.create_session("test-batch")
+        
+        events = await streaming_parser.parse_chunks(
+            session_id,
+            incomplete_json_chunks,
+            is_final=True
+        )
+        
+        assert len(events) > 0
+        data = streaming_parser.get_current_data(session_id)
+        assert data == json.loads("".join(incomplete_json_chunks))
+    
     @pytest.mark.asyncio
     async def test_multiple_sessions(self, streaming_parser: StreamingParser):
         """测试多会话处理"""
@@ -278,6 +299,56 @@ class TestJSONCompleter:
         
         # 应该尝试修复或返回错误信息
         assert result is not None
+    
+    def test_valid_json_passthrough(self, json_completer: JSONCompleter):
+        """测试有效JSON原样返回"""
+        # 包括orjson不接受但标准库接受的输入
+        for valid in ['{"a": [1, 2]}', '{"a": NaN}', '[123456789012345678901234567890]']:
+            result = json_completer.complete(valid)
+            assert result.is_valid
+            assert not result.completion_applied
+            assert result.completed_json == valid
+    
+    def test_convenience_functions(self):
+        """测试便捷函数结果稳定"""
+        # 每次调用使用独立的补全器，之前的失败不影响后续结果
+        results = [complete_json('{"a": @@', CompletionStrategy.CONSERVATIVE) for _ in range(5)]
+        assert len({result.completed_json for result in results}) == 1
+        assert all(result.strategy_used == CompletionStrategy.CONSERVATIVE for result in results)
+        
+        assert complete_json('{"a": 1').completed_json == '{"a":1}'
+        assert is_json_incomplete('{"a": [1')
+        assert not is_json_incomplete('{"a": [1]}')
+    
+    def test_fix_missing_commas(self, json_completer: JSONCompleter):
+        """测试缺失逗号修复"""
+        assert json_completer._fix_missing_commas('{"a":1 "b":2}') == '{"a":1,"b":2}'
+        assert json_completer._fix_missing_commas('[1 2]') == '[1,2]'
+        
+        # 不含空白的长值没有可修复之处，原样返回
+        long_value = '{"k":"' + 'x' * 20000 + '"}'
+        assert json_completer._fix_missing_commas(long_value) == long_value
+    
+    def test_is_likely_incomplete(self, json_completer: JSONCompleter):
+        """测试不完整JSON检测"""
+        assert json_completer.is_likely_incomplete('{"a": [1, 2]}') == (False, [])
+        
+        # 字符串内的括号和转义引号不影响括号平衡
+        is_incomplete, reasons = json_completer.is_likely_incomplete('{"a": "x]\\"y", "b": [1')
+        assert is_incomplete
+        assert reasons == ["Unclosed brackets: ['{', '[']"]
+        
+        _, reasons = json_completer.is_likely_incomplete('{"a": 1]} ]')
+        assert reasons == [
+            "Mismatched bracket: expected }, got ]",
+            "Unmatched closing bracket: ]"
+        ]
+        
+        # 逐步增长的输入从上次的断点继续扫描，结果与完整扫描一致
+        text = '{"a": "x\\"}", "b": [1, {"c": 2}]}'
+        for end in range(1, len(text) + 1):
+            assert json_completer.is_likely_incomplete(text[:end]) == \
+                JSONCompleter().is_likely_incomplete(text[:end])
 
 
 class TestPathBuilder:
@@ -434,6 +505,185 @@ class TestPathBuilder:
         assert nonexistent is None
 
 
+class TestIncrementalJsonParser:
+    """增量JSON解析器测试"""
+    
+    def test_feed_across_chunk_boundaries(self):
+        """测试跨数据块边界的增量解析"""
+        data = {
+            "languages": [
+                {"name": "Py\"thon", "year": 1991, "tags": [True, None, 2.5]},
+                {"name": "中文\n", "empty": {}, "items": []}
+            ],
+            "count": -2
+        }
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        
+        for chunk_size in (1, 3, 50):
+            parser = IncrementalJsonParser()
+            events = []
+            for i in range(0, len(text), chunk_size):
+                events.extend(parser.feed(text[i:i + chunk_size]))
+            
+            assert parser.done
+            assert parser.depth == 0
+            values = {format_path(segments): value for segments, value in events}
+            assert values == {
+                "languages[0].name": "Py\"thon",
+                "languages[0].year": 1991,
+                "languages[0].tags[0]": True,
+                "languages[0].tags[1]": None,
+                "languages[0].tags[2]": 2.5,
+                "languages[1].name": "中文\n",
+                "count": -2
+            }
+    
+    def test_values_emitted_when_complete(self):
+        """测试值在完成时立即产出"""
+        parser = IncrementalJsonParser()
+        
+        assert parser.feed('{"a": "hel') == []
+        assert parser.feed('lo", "b": 12') == [(("a",), "hello")]
+        assert parser.feed('3}') == [(("b",), 123)]
+        assert parser.done
+    
+    def test_partial_string(self):
+        """测试未结束字符串值的已接收部分"""
+        parser = IncrementalJsonParser()
+        assert parser.feed('{"text": "hel') == []
+        assert parser.partial_string() == (("text",), "hel")
+        
+        # 不完整的转义序列留到下一个数据块
+        parser.feed('lo\\u4e')
+        assert parser.partial_string() == (("text",), "hello")
+        parser.feed('2d!')
+        assert parser.partial_string() == (("text",), "hello中!")
+        
+        assert parser.feed('", "b') == [(("text",), "hello中!")]
+        # 对象键不是字符串值
+        assert parser.partial_string() is None
+    
+    def test_partial_string_split_surrogate_pair(self):
+        """测试代理对在数据块之间切分时不提前输出高位部分"""
+        parser = IncrementalJsonParser()
+        parser.feed('{"text": "a\\ud83d')
+        assert parser.partial_string() == (("text",), "a")
+        parser.feed('\\ude00b')
+        assert parser.partial_string() == (("text",), "a😀b")
+        
+        # 转义的反斜杠后面的u不是转义序列
+        parser = IncrementalJsonParser()
+        parser.feed('{"text": "a\\\\u12')
+        assert parser.partial_string() == (("text",), "a\\u12")
+        
+        text = json.dumps({"text": "x😀y\\u😀"})
+        for split in range(1, len(text)):
+            parser = IncrementalJsonParser()
+            events = parser.feed(text[:split])
+            partial = parser.partial_string()
+            events += parser.feed(text[split:])
+            assert events == [(("text",), "x😀y\\u😀")]
+            if partial is not None:
+                assert events[0][1].startswith(partial[1])
+    
+    def test_top_level_literal_and_invalid_input(self):
+        """测试顶层字面量和非法输入"""
+        parser = IncrementalJsonParser()
+        assert parser.feed("42") == []
+        assert parser.close() == [((), 42)]
+        
+        with pytest.raises(ValueError):
+            IncrementalJsonParser().feed('{"a" 1}')
+    
+    def test_compile_field_spec(self):
+        """测试字段路径编译和后缀匹配"""
+        spec = compile_field_spec(("name", "languages[1].description"))
+        
+        assert match_field_spec(spec, ("name",))
+        assert match_field_spec(spec, ("languages", 0, "name"))
+        assert match_field_spec(spec, ("languages", 1, "description"))
+        assert not match_field_spec(spec, ("languages", 0, "description"))
+        assert not match_field_spec(spec, ("languages", 0, "year"))
+        
+        # 相同字段只编译一次
+        assert compile_field_spec(("name", "languages[1].description")) is spec
+        
+        # [*] 匹配任意数组下标
+        wildcard_spec = compile_field_spec(("languages[*].name", "tags[*]"))
+        assert match_field_spec(wildcard_spec, ("languages", 2, "name"))
+        assert match_field_spec(wildcard_spec, ("data", "languages", 0, "name"))
+        assert match_field_spec(wildcard_spec, ("tags", 5))
+        assert not match_field_spec(wildcard_spec, ("languages", "x", "name"))
+        assert not match_field_spec(wildcard_spec, ("languages", 0, "year"))
+    
+    def test_stream_filter_tokens(self):
+        """测试流式JSON结构过滤与 loads -> 过滤 -> dumps 结果一致"""
+        data = {
+            "languages": [
+                {"name": "Python", "year": 1991, "creator": {"name": "Guido"}},
+                {"name": "Java", "year": 1995, "tags": ["a", "b\\", "c"]}
+            ],
+            "year": [1, 2]
+        }
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        spec = compile_field_spec(("year", "creator", "tags[1]"))
+        
+        expected = {
+            "languages": [
+                {"name": "Python"},
+                {"name": "Java", "tags": ["a", "c"]}
+            ]
+        }
+        
+        for chunk_size in (1, 7, 64):
+            chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+            result = "".join(stream_filter_tokens(chunks, spec))
+            assert json.loads(result) == expected
+            assert result == json.dumps(expected, ensure_ascii=False, separators=(",", ":"))
+    
+    def test_stream_filter_tokens_split_escaped_quotes(self):
+        """测试数据块在转义引号处切分时的流式过滤"""
+        data = {"k\"": "v\"q", "year": "x\"y", "n": ["a\\", "\"b\""]}
+        text = json.dumps(data, ensure_ascii=False)
+        spec = compile_field_spec(("year",))
+        expected = json.dumps(
+            {"k\"": "v\"q", "n": ["a\\", "\"b\""]},
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        
+        for split in range(1, len(text)):
+            chunks = [text[:split], text[split:]]
+            assert "".join(stream_filter_tokens(chunks, spec)) == expected
+    
+    def test_stream_filter_tokens_skip_escaped_quotes(self):
+        """测试被排除的容器中含转义引号时的跨块跳过"""
+        data = {"year": {"x": "a\"}", "y": ["]\"", {"z": "\\"}]}, "n": 2}
+        text = json.dumps(data, ensure_ascii=False)
+        spec = compile_field_spec(("year",))
+        
+        for split in range(1, len(text)):
+            chunks = [text[:split], text[split:]]
+            assert "".join(stream_filter_tokens(chunks, spec)) == '{"n":2}'
+    
+    def test_stream_filter_tokens_single_char_chunks(self):
+        """测试逐字符输入时未闭合字符串的续扫"""
+        data = {
+            "desc": "long \"quoted\" text\\" * 20,
+            "year": {"x": "a\"}\\", "y": ["]\""]},
+            "n": ["\\", "\"b\""]
+        }
+        text = json.dumps(data, ensure_ascii=False)
+        spec = compile_field_spec(("year",))
+        expected = json.dumps(
+            {"desc": data["desc"], "n": data["n"]},
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        
+        assert "".join(stream_filter_tokens(list(text), spec)) == expected
+
+
 @pytest.mark.performance
 class TestPerformance:
     """性能测试"""
@@ -3,6 +3,7 @@
 测试MemoryManager类的会话跟踪、自动清理和垃圾回收功能。
 """
 
+import os
 import pytest
 import time
 import gc
@@ -118,6 +119,43 @@ class TestMemoryManager:
         # 验证死引用已被清理
         assert weak_ref() is None  # 对象应该已被回收
     
+    def test_dead_session_reference_cleanup(self, memory_manager: MemoryManager):
+        """测试批量清理会话死引用"""
+        class TestObject:
+            pass
+        
+        alive = TestObject()
+        memory_manager.register_session("alive", alive)
+        
+        for i in range(3):
+            memory_manager.register_session(f"dead_{i}", TestObject())
+        gc.collect()
+        
+        # 被回收的会话已自动移出，清理时移除其注册时间
+        assert not memory_manager.has_session("dead_0")
+        assert memory_manager.cleanup_dead_references() == 3
+        assert list(memory_manager.session_refs) == ["alive"]
+        assert list(memory_manager.session_timestamps) == ["alive"]
+        assert memory_manager.has_session("alive")
+    
+    def test_reregistered_session_survives_old_object(self, memory_manager: MemoryManager):
+        """测试重新注册会话后，旧对象被回收不影响新会话"""
+        class TestObject:
+            pass
+        
+        old_object = TestObject()
+        new_object = TestObject()
+        memory_manager.register_session("session", old_object)
+        memory_manager.register_session("session", new_object)
+        memory_manager.register_cache_object("cache", {"version": 1})
+        memory_manager.register_cache_object("cache", {"version": 2})
+        
+        del old_object
+        gc.collect()
+        
+        assert memory_manager.has_session("session")
+        assert memory_manager.get_memory_usage()['cache_details']["cache"] == {"version": 2}
+    
     def test_memory_threshold_check(self, memory_manager: MemoryManager):
         """测试内存阈值检查功能"""
         # 模拟内存使用量
@@ -131,7 +169,35 @@ class TestMemoryManager:
             
             # 应该超过阈值
             assert exceeded is True
-    
+
+    def test_memory_sample_cached(self, memory_manager: MemoryManager):
+        """测试进程对象复用及内存读数缓存"""
+        with patch('psutil.Process') as mock_process:
+            mock_process.return_value.memory_info.return_value.rss = 64 * 1024 * 1024
+
+            first = memory_manager.get_memory_usage()
+            second = memory_manager.get_memory_usage()
+
+            # 缓存时间内只创建一次进程对象、只读取一次内存
+            assert mock_process.call_count == 1
+            assert mock_process.return_value.memory_info.call_count == 1
+            assert first['memory_mb'] == second['memory_mb'] == 64.0
+
+    def test_cleanup_reports_fresh_memory(self, memory_manager: MemoryManager):
+        """测试清理后的内存读数不使用清理前的缓存"""
+        reported = []
+        memory_manager.add_memory_callback('record', lambda info: reported.append(info['memory_mb']))
+        with patch('psutil.Process') as mock_process:
+            memory_info = mock_process.return_value.memory_info
+            memory_info.return_value.rss = 64 * 1024 * 1024
+            assert memory_manager.get_memory_usage()['memory_mb'] == 64.0
+
+            memory_info.return_value.rss = 32 * 1024 * 1024
+            memory_manager.perform_cleanup()
+
+            assert reported == [32.0]
+            assert memory_manager.get_memory_usage()['memory_mb'] == 32.0
+
     def test_force_garbage_collection(self, memory_manager: MemoryManager):
         """测试强制垃圾回收功能"""
         # 获取初始垃圾回收统计
@@ -186,6 +252,22 @@ class TestMemoryManager:
         # 验证会话数量被限制
         memory_info = limited_manager.get_memory_usage()
         assert memory_info['active_sessions'] <= 3
+
+    def test_session_eviction_order(self):
+        """测试超出限制时按注册顺序淘汰最旧的会话"""
+        limited_manager = MemoryManager(max_sessions=3)
+        
+        for i in range(4):
+            limited_manager.register_session(f"session_{i}", {"index": i})
+        assert not limited_manager.has_session("session_0")
+        
+        # 重复注册的会话移到末尾，下一次淘汰session_2
+        limited_manager.register_session("session_1", {"index": 1})
+        limited_manager.register_session("session_4", {"index": 4})
+        
+        assert list(limited_manager.session_timestamps) == ["session_3", "session_1", "session_4"]
+        assert not limited_manager.has_session("session_2")
+        limited_manager.stop()
     
     def test_memory_usage_reporting(self, memory_manager: MemoryManager):
         """测试内存使用情况报告"""
@@ -240,6 +322,52 @@ class TestMemoryManager:
         # 验证清理效果（会话应该过期并被清理）
         assert final_sessions <= initial_sessions
     
+    def test_shared_cleanup_thread(self, memory_manager: MemoryManager):
+        """测试多个内存管理器共用一个清理线程"""
+        from src.agently_format.core import memory_manager as memory_manager_module
+
+        scheduler = memory_manager_module._cleanup_scheduler
+        managers = [MemoryManager(cleanup_interval=60) for _ in range(3)]
+        cleanup_thread = scheduler._thread
+        assert cleanup_thread is not None and cleanup_thread.is_alive()
+
+        managers.append(MemoryManager(cleanup_interval=60))
+        assert scheduler._thread is cleanup_thread
+        
+        # 调度器只持有弱引用，管理器可以被回收
+        manager_ref = weakref.ref(managers.pop())
+        gc.collect()
+        assert manager_ref() is None
+        
+        for manager in managers:
+            manager.stop()
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="需要os.fork")
+    def test_cleanup_thread_after_fork(self, memory_manager: MemoryManager):
+        """测试fork出的子进程重新启动清理线程"""
+        from src.agently_format.core import memory_manager as memory_manager_module
+
+        scheduler = memory_manager_module._cleanup_scheduler
+        parent_thread = scheduler._thread
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                child_manager = MemoryManager(cleanup_interval=60)
+                thread = scheduler._thread
+                ok = thread is not parent_thread and thread.is_alive()
+                child_manager.stop()
+                os.write(write_fd, b"1" if ok else b"0")
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        result = os.read(read_fd, 1)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        
+        assert result == b"1"
+        assert scheduler._thread is parent_thread
+    
     def test_error_handling(self, memory_manager: MemoryManager):
         """测试错误处理"""
         # 测试无效会话ID
@@ -7,7 +7,7 @@ import pytest
 import time
 from typing import List, Dict, Any
 
-from src.agently_format.core.performance_optimizer import PerformanceOptimizer
+from src.agently_format.core.performance_optimizer import PerformanceOptimizer, StringDeltaOptimizer
 
 
 class TestPerformanceOptimizer:
@@ -41,9 +41,14 @@ class TestPerformanceOptimizer:
         # 验证结果一致性
         assert delta1 == delta2
         assert delta1['start'] == 6
-        assert delta1['end'] == 11
+        assert delta1['end'] == 6
         assert delta1['new_text'] == "Beautiful "
         
+        # 用替换区间修改旧字符串得到新字符串
+        for old_value, new_value in [(old_str, new_str), ("Hello World", "Hello"), ("abcabc", "abc"), ("Hello", "")]:
+            delta = optimizer.calculate_string_delta(old_value, new_value)
+            assert old_value[:delta['start']] + delta['new_text'] + old_value[delta['end']:] == new_value
+        
         # 验证缓存效果（第二次应该更快）
         assert second_time < first_time or second_time < 0.001  # 允许极小的时间差
         
@@ -52,6 +57,31 @@ class TestPerformanceOptimizer:
         assert stats['string_delta_cache']['hits'] >= 1
         assert stats['string_delta_cache']['total'] >= 2
     
+    def test_string_delta_lru_eviction(self):
+        """测试字符串增量缓存按最近使用顺序淘汰"""
+        string_optimizer = StringDeltaOptimizer(max_cache_size=2)
+        string_optimizer.calculate_optimized_delta("a", "ab")
+        string_optimizer.calculate_optimized_delta("b", "bc")
+        
+        # 命中后成为最近使用的项，下一次淘汰("b", "bc")
+        assert string_optimizer.calculate_optimized_delta("a", "ab") == "b"
+        string_optimizer.calculate_optimized_delta("c", "cd")
+        
+        assert list(string_optimizer._cache) == [("a", "ab"), ("c", "cd")]
+    
+    def test_string_delta_cache_stats(self):
+        """测试增量缓存和替换区间缓存分别统计"""
+        string_optimizer = StringDeltaOptimizer(max_cache_size=2)
+        for old, new in [("a", "ab"), ("b", "bc"), ("c", "cd")]:
+            string_optimizer.calculate_optimized_delta(old, new)
+            string_optimizer.calculate_delta_range(old, new)
+        
+        stats = string_optimizer.get_cache_stats()
+        assert stats["delta_cache_size"] == 2
+        assert stats["range_cache_size"] == 2
+        assert stats["cache_size"] == 4
+        assert stats["cache_utilization"] == 1.0
+    
     def test_path_matching_cache(self, optimizer: PerformanceOptimizer):
         """测试路径匹配缓存功能"""
         path = "users.0.profile.name"
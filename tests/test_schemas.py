@@ -31,7 +31,8 @@ from src.agently_format.core.schemas import (
     SchemaValidator,
     validate_json_path,
     create_schema_validator,
-    _get_value_by_path
+    _get_value_by_path,
+    parse_json_path
 )
 
 
@@ -219,6 +220,25 @@ class TestSchemaValidator(unittest.TestCase):
         self.assertFalse(result.is_valid)
         self.assertTrue(any(issue.constraint == "pattern" for issue in result.issues))
     
+    def test_precompiled_pattern_validation(self):
+        """测试预编译的正则表达式模式"""
+        import re
+        email_schema = {
+            "type": "string",
+            "pattern": re.compile(r"^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$")
+        }
+        validator = SchemaValidator({"type": "object", "properties": {"email": email_schema}})
+        context = ValidationContext("session_id", 0)
+        context.schema_cache["email"] = email_schema
+        
+        result = validator.validate_path("email", "test@example.com", context)
+        self.assertTrue(result.is_valid)
+        
+        result = validator.validate_path("email", "test.example.com", context)
+        self.assertFalse(result.is_valid)
+        self.assertTrue(any(issue.constraint == "pattern" for issue in result.issues))
+        self.assertEqual(validator._regex_cache, {})
+    
     def test_repair_suggestions(self):
         """测试修复建议生成"""
         # 类型转换建议
@@ -311,6 +331,21 @@ class TestUtilityFunctions(unittest.TestCase):
         with self.assertRaises(IndexError):
             _get_value_by_path(data, "user.contacts[5].type")
     
+    def test_parse_json_path(self):
+        """测试 JSON 路径解析"""
+        self.assertEqual(parse_json_path(""), ())
+        self.assertEqual(parse_json_path("user.name"), ("user", "name"))
+        self.assertEqual(
+            parse_json_path("user.contacts[0].type"), ("user", "contacts", 0, "type")
+        )
+        self.assertEqual(parse_json_path("[1].id"), (1, "id"))
+        
+        # 相同路径命中缓存
+        parse_json_path.cache_clear()
+        parse_json_path("items[0].id")
+        parse_json_path("items[0].id")
+        self.assertEqual(parse_json_path.cache_info().hits, 1)
+    
     def test_validate_json_path(self):
         """测试 JSON 路径验证便捷函数"""
         data = {"user": {"name": "Alice", "age": 30}}